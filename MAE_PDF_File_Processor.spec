@@ -10,7 +10,9 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # The GUI only writes CSV; pyarrow (parquet/feather in mae_cli.py) would add ~100 MB that the
+    # one-file exe unpacks on every launch
+    excludes=['pyarrow'],
     noarchive=False,
     optimize=0,
 )
@@ -0,0 +1,131 @@
+"""Throughput benchmark for every statement parser on synthetic PDFs.
+
+For each mode, statements are generated with synthetic_statements.py and run through four
+cumulative stages, each in a fresh process so its peak RSS is its own:
+
+    extract  PyMuPDF text extraction only (rows = lines of text)
+    filter   + the pipeline's page pruning and section/header filtering (rows = lines passed to the parser)
+    parse    + the line parser and DataFrame building per file (rows = transactions)
+    folder   + the mode's final step and streaming the rows to a CSV, as mae_cli.py does (rows = transactions)
+
+Each stage includes the ones before it, so the difference between two stages is the cost of
+the later one. Run from the repository root:
+
+    python benchmarks/bench_parsers.py --files 20 --pages 5 --transactions 40 [--modes cimb-debit rhb-flex] [--json out.json]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fitz  # PyMuPDF
+
+import mae_engine
+from mae_engine import PROCESSING_MODES, iter_pdf_pages, read_statement, parse_statement, iter_parse_pdf_files, finalized_frames, stream_csv
+from synthetic_statements import write_folder
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+STAGES = ("extract", "filter", "parse", "folder")
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def run_stage(stage, mode, folder):
+    pdf_paths = mae_engine.list_pdf_files(folder)
+    start = time.perf_counter()
+    rows = 0
+    if stage == "extract":
+        for pdf_path in pdf_paths:
+            rows += sum(text.count('\n') for text in iter_pdf_pages(pdf_path))
+    elif stage == "filter":
+        spec = PROCESSING_MODES[mode]
+        for pdf_path in pdf_paths:
+            statement = read_statement(pdf_path, spec, {"pdf_path": pdf_path})
+            if spec["read"] == "document":
+                # Word-position templates have no separate filtering; count the pages instead
+                with statement:
+                    rows += statement.page_count
+            elif spec["read"] == "pages":
+                rows += sum(text.count('\n') + 1 for text in statement)
+            else:
+                rows += sum(1 for _ in statement)
+    elif stage == "parse":
+        for pdf_path in pdf_paths:
+            df = parse_statement(pdf_path, mode)
+            rows += 0 if df is None else len(df)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            results = iter_parse_pdf_files(pdf_paths, mode)
+            rows = stream_csv(finalized_frames(results, mode), os.path.join(tmp, "bench.csv"))
+    return time.perf_counter() - start, rows, peak_rss_mb()
+
+def benchmark_mode(mode, folder, pages):
+    results = []
+    spawn = multiprocessing.get_context("spawn")
+    for stage in STAGES:
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as executor:
+            seconds, rows, rss = executor.submit(run_stage, stage, mode, folder).result()
+        results.append({
+            "mode": mode,
+            "stage": stage,
+            "seconds": seconds,
+            "pages": pages,
+            "pages_per_sec": pages / seconds if seconds else None,
+            "rows": rows,
+            "rows_per_sec": rows / seconds if seconds else None,
+            "peak_rss_mb": rss,
+        })
+    return results
+
+def print_table(results):
+    print(f"{'mode':<15} {'stage':<8} {'seconds':>8} {'pages/s':>9} {'rows':>8} {'rows/s':>10} {'peak RSS MB':>12}")
+    for r in results:
+        rss = f"{r['peak_rss_mb']:.1f}" if r['peak_rss_mb'] is not None else "n/a"
+        print(f"{r['mode']:<15} {r['stage']:<8} {r['seconds']:>8.3f} {r['pages_per_sec']:>9.1f} "
+              f"{r['rows']:>8} {r['rows_per_sec']:>10.0f} {rss:>12}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", nargs="+", choices=sorted(PROCESSING_MODES), default=list(PROCESSING_MODES))
+    parser.add_argument("--files", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=3, help="Statement pages per file (long pages overflow onto extra pages)")
+    parser.add_argument("--transactions", type=int, default=30, help="Transactions per statement page")
+    parser.add_argument("--notice-pages", type=int, default=0, help="Terms-and-conditions pages appended to each statement")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in args.modes:
+            folder = os.path.join(tmp, mode)
+            pdf_paths = write_folder(mode, folder, args.files, args.pages, args.transactions, notice_pages=args.notice_pages)
+            pages = 0
+            for pdf_path in pdf_paths:
+                with fitz.open(pdf_path) as doc:
+                    pages += doc.page_count
+            results += benchmark_mode(mode, folder, pages)
+
+    print_table(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
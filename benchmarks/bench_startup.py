@@ -0,0 +1,70 @@
+"""Cold-start benchmark for the GUI: what the window waits for, and what the first result waits for.
+
+Each measurement runs in a fresh Python process, like launching the app:
+
+    window        importing MAE_PDF_File_Processor, which is all that runs before the window is built
+    parsers       importing the parsers (pandas and PyMuPDF), which the GUI does in the background
+    first_result  importing the parsers and parsing one synthetic statement
+
+Times are the whole process (interpreter start included), median of --runs. Run from the
+repository root:
+
+    python benchmarks/bench_startup.py [--runs 5] [--json out.json]
+
+The GUI itself prints the same milestones for a real launch with
+`python MAE_PDF_File_Processor.py --startup-times` (or the built .exe with --startup-times).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_statements import write_statement
+
+
+def snippets(pdf_path):
+    return {
+        "window": "import MAE_PDF_File_Processor",
+        "parsers": "import mae_engine, mae_store",
+        "first_result": f"import mae_engine; mae_engine.parse_statement({pdf_path!r}, 'maybank-debit')",
+    }
+
+def run_once(code):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "statement_2024_0000.pdf")
+        write_statement("maybank-debit", pdf_path, pages=2)
+        run_once("import mae_engine")  # Warm the OS file cache so the first measurement is not an outlier
+        for name, code in snippets(pdf_path).items():
+            times = [run_once(code) for _ in range(args.runs)]
+            results.append({"measure": name, "median_seconds": statistics.median(times),
+                            "min_seconds": min(times), "runs": args.runs})
+
+    print(f"{'measure':<14} {'median s':>9} {'min s':>8}")
+    for r in results:
+        print(f"{r['measure']:<14} {r['median_seconds']:>9.3f} {r['min_seconds']:>8.3f}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Generate synthetic statement PDFs in the layouts the parsers expect.
+
+The text is made up but the line order, date formats, amount formats and header/footer markers
+follow each bank's statement, so every parser stage does its normal amount of work.
+
+Run from the repository root to write a folder of statements:
+    python benchmarks/synthetic_statements.py maybank-debit out_folder --files 10 --pages 5 --transactions 30
+"""
+import argparse
+import os
+import random
+from datetime import date, timedelta
+
+import fitz  # PyMuPDF
+
+
+PAYEES = ["JOHN DOE", "ALICE TAN", "SHOPEE MALAYSIA", "GRAB RIDES", "TNB ELECTRIC", "99 SPEEDMART", "LAZADA", "AEON BIG"]
+TYPES = ["TRANSFER FR A/C", "FPX PAYMENT", "DUITNOW TRANSFER", "POS PURCHASE", "CASH WITHDRAWAL", "PROFIT PAID"]
+RHB_TYPES = ["DUITNOW", "INWARD IBG", "RFLX INSTANT TRF DR", "CASH DEPOSIT", "RPP INWARD INST TRF"]
+
+def money(value):
+    return f"{value:,.2f}"
+
+def transactions(rng, count, start):
+    # (date, payee, type, signed amount, balance after)
+    balance = rng.uniform(1_000, 50_000)
+    day = start
+    for _ in range(count):
+        day += timedelta(days=rng.random() < 0.3)
+        amount = round(rng.uniform(1, 2_000), 2) * (1 if rng.random() < 0.35 else -1)
+        balance = max(balance + amount, 1_000.0)
+        yield day, rng.choice(PAYEES), rng.choice(TYPES), amount, balance
+
+# x positions of the Maybank/M2U table columns; a tuple of (x, text) cells is printed as one row
+DATE_X, DESCRIPTION_X, AMOUNT_X, BALANCE_X = 30, 80, 330, 430
+MAYBANK_HEADER = ((DATE_X, "ENTRY DATE"), (DESCRIPTION_X, "TRANSACTION DESCRIPTION"),
+                  (AMOUNT_X, "TRANSACTION AMOUNT"), (BALANCE_X, "STATEMENT BALANCE"))
+
+def maybank_row(date_text, t_type, amount, balance):
+    sign = '+' if amount > 0 else '-'
+    return ((DATE_X, date_text), (DESCRIPTION_X, t_type), (AMOUNT_X, money(abs(amount)) + sign), (BALANCE_X, money(balance)))
+
+def maybank_debit_pages(rng, pages, per_page, start):
+    rows = list(transactions(rng, pages * per_page, start))
+    for p in range(pages):
+        lines = [
+            "Maybank Islamic Berhad", "SAVINGS ACCOUNT-i", "JOHN DOE", "NO 1 JALAN CONTOH",
+            "Please notify us of any change of address in writing.",
+            MAYBANK_HEADER,
+        ]
+        for day, payee, t_type, amount, balance in rows[p * per_page:(p + 1) * per_page]:
+            lines += [maybank_row(day.strftime('%d/%m/%y'), t_type, amount, balance),
+                      ((DESCRIPTION_X, payee + " *"),), ((DESCRIPTION_X, "REF " + str(rng.randint(10_000, 99_999))),)]
+        if p == pages - 1:
+            lines += [((DATE_X, "ENDING BALANCE :"), (BALANCE_X, money(rows[-1][4]))), "TOTAL DEBIT :"]
+        yield lines
+
+def maybank_credit_pages(rng, pages, per_page, start):
+    rows = list(transactions(rng, pages * per_page, start))
+    for p in range(pages):
+        lines = ["MAYBANK VISA PLATINUM", "STATEMENT OF ACCOUNT", "JOHN DOE"]
+        for day, payee, _, amount, _ in rows[p * per_page:(p + 1) * per_page]:
+            posted = day + timedelta(days=1)
+            lines += [day.strftime('%d/%m'), posted.strftime('%d/%m'), payee, "KUALA LUMPUR MY"]
+            lines.append(money(abs(amount)) + ("CR" if amount > 0 else ""))
+        yield lines
+
+def m2u_pages(rng, pages, per_page, start):
+    rows = list(transactions(rng, pages * per_page, start))
+    for p in range(pages):
+        lines = [
+            "Malayan Banking Berhad (3813-K)", "STATEMENT DATE", (start + timedelta(days=30)).strftime('%d/%m/%y'),
+            "ACCOUNT NUMBER", "All items and balances are denoted by DR",
+            MAYBANK_HEADER,
+        ]
+        if p == 0:
+            lines += [((DESCRIPTION_X, "BEGINNING BALANCE"), (BALANCE_X, money(rows[0][4])))]
+        for day, payee, t_type, amount, balance in rows[p * per_page:(p + 1) * per_page]:
+            lines += [maybank_row(day.strftime('%d/%m'), t_type, amount, balance), ((DESCRIPTION_X, payee),)]
+        if p == pages - 1:
+            lines += [((DATE_X, "ENDING BALANCE :"), (BALANCE_X, money(rows[-1][4]))), "TOTAL CREDIT :"]
+        lines += ["FCN", "PLEASE BE INFORMED TO CHECK YOUR BANK ACCOUNT BALANCES REGULARLY"]
+        yield lines
+
+def cimb_pages(rng, pages, per_page, start):
+    rows = list(transactions(rng, pages * per_page, start))
+    for p in range(pages):
+        lines = ["Page / Halaman", f"{p + 1} / {pages}", "CIMB ISLAMIC BANK BERHAD", "ISLAMIC BBB-PPPP"]
+        if p == 0:
+            lines += ["OPENING BALANCE", money(rows[0][4])]
+        for day, payee, t_type, amount, balance in rows[p * per_page:(p + 1) * per_page]:
+            lines += [day.strftime('%d/%m/%Y') + " " + t_type, payee, "FUND TRANSFER", f"{amount:.2f}", money(balance), str(rng.randint(100_000, 999_999))]
+        yield lines
+
+RHB_HEADER = "Date Branch Description Sender's / Beneficiary's Name Amount (DR) Amount (CR) Balance"
+
+def rhb_flex_pages(rng, pages, per_page, start):
+    rows = list(transactions(rng, pages * per_page, start))
+    for p in range(pages):
+        lines = ["RHB BANK BERHAD", RHB_HEADER]
+        for day, payee, _, amount, balance in rows[p * per_page:(p + 1) * per_page]:
+            sign = '+' if amount > 0 else '-'
+            lines += [day.strftime('%d-%m-%y'),
+                      f"{money(balance)}+ {payee} SDN BHD payment {rng.randint(100, 999)} REF{rng.randint(10_000_000, 99_999_999)}",
+                      rng.choice(RHB_TYPES), money(abs(amount)) + sign]
+        lines += ["www.rhbgroup.com For Any Enquiries"]
+        yield lines
+
+# The same statement printed as a table, as the layout-aware mode reads it: one row per transaction
+# with the references on the lines under the name
+RHB_DATE_X, RHB_BRANCH_X, RHB_DESCRIPTION_X, RHB_NAME_X, RHB_DR_X, RHB_CR_X, RHB_BALANCE_X = 30, 70, 105, 230, 360, 420, 480
+RHB_TABLE_HEADER = ((RHB_DATE_X, "Date"), (RHB_BRANCH_X, "Branch"), (RHB_DESCRIPTION_X, "Description"),
+                    (RHB_NAME_X, "Sender's / Beneficiary's Name"), (RHB_DR_X, "Amount (DR)"),
+                    (RHB_CR_X, "Amount (CR)"), (RHB_BALANCE_X, "Balance"))
+
+def rhb_flex_table_pages(rng, pages, per_page, start):
+    rows = list(transactions(rng, pages * per_page, start))
+    for p in range(pages):
+        lines = ["RHB BANK BERHAD", "Statement Date " + (start + timedelta(days=30)).strftime('%d-%m-%y'), RHB_TABLE_HEADER,
+                 ((RHB_NAME_X, "Reference 1 / Recipient's Reference"),), ((RHB_NAME_X, "Reference 2 / Other Payment Details"),)]
+        for day, payee, _, amount, balance in rows[p * per_page:(p + 1) * per_page]:
+            amount_x = RHB_CR_X if amount > 0 else RHB_DR_X
+            lines += [((RHB_DATE_X, day.strftime('%d-%m-%y')), (RHB_BRANCH_X, str(rng.randint(100, 999))),
+                       (RHB_DESCRIPTION_X, rng.choice(RHB_TYPES)), (RHB_NAME_X, payee + " SDN BHD"),
+                       (amount_x, money(abs(amount))), (RHB_BALANCE_X, money(balance) + "+")),
+                      ((RHB_NAME_X, f"payment {rng.randint(100, 999)}"),),
+                      ((RHB_NAME_X, f"REF{rng.randint(10_000_000, 99_999_999)}"),)]
+        lines += ["www.rhbgroup.com For Any Enquiries"]
+        yield lines
+
+LAYOUTS = {
+    "maybank-debit": maybank_debit_pages,
+    "maybank-credit": maybank_credit_pages,
+    "cimb-debit": cimb_pages,
+    "maybank-debit-layout": maybank_debit_pages,
+    "m2u-current": m2u_pages,
+    "m2u-current-layout": m2u_pages,
+    "m2u-debit": m2u_pages,
+    "m2u-debit-layout": m2u_pages,
+    "rhb-flex": rhb_flex_pages,
+    "rhb-flex-layout": rhb_flex_table_pages,
+}
+
+# Printed again at the top of overflow pages, as the bank does when a table continues
+OVERFLOW_HEADERS = {layout: MAYBANK_HEADER for layout in ("maybank-debit", "maybank-debit-layout", "m2u-current", "m2u-current-layout", "m2u-debit", "m2u-debit-layout")}
+OVERFLOW_HEADERS["rhb-flex"] = ((30, RHB_HEADER),)
+OVERFLOW_HEADERS["rhb-flex-layout"] = RHB_TABLE_HEADER
+
+NOTICE = ("The Bank may vary these terms and conditions at any time by giving notice. Please examine this statement "
+          "and report any discrepancy within 14 days, failing which it is deemed correct.")
+
+def notice_page(doc):
+    # A dense terms-and-conditions page with no transactions
+    page = doc.new_page()
+    y = 30
+    while y < page.rect.height - 30:
+        page.insert_text((30, y), NOTICE[:150], fontsize=6)
+        page.insert_text((30, y + 7), NOTICE[150:], fontsize=6)
+        y += 14
+
+def write_statement(layout, pdf_path, pages=3, transactions_per_page=30, seed=0, notice_pages=0):
+    rng = random.Random(seed)
+    start = date(2024, 1, 1) + timedelta(days=rng.randint(0, 300))
+    doc = fitz.open()
+    header = OVERFLOW_HEADERS.get(layout)
+    for lines in LAYOUTS[layout](rng, pages, transactions_per_page, start):
+        page = doc.new_page()
+        # Lines that would run off the page continue on an overflow page, like a long statement would
+        y = 30
+        for line in lines:
+            if y > page.rect.height - 30:
+                page = doc.new_page()
+                y = 30
+                if header is not None:
+                    for x, text in header:
+                        page.insert_text((x, y), text, fontsize=7)
+                    y += 9
+            for x, text in ((30, line),) if isinstance(line, str) else line:
+                page.insert_text((x, y), text, fontsize=7)
+            y += 9
+    for _ in range(notice_pages):
+        notice_page(doc)
+    doc.save(pdf_path)
+    doc.close()
+
+def write_folder(layout, folder, files=5, pages=3, transactions_per_page=30, seed=0, notice_pages=0):
+    """Write `files` statements for one layout into folder and return their paths."""
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    for i in range(files):
+        # The credit card parser takes the year from the file name
+        pdf_path = os.path.join(folder, f"statement_2024_{i:04d}.pdf")
+        write_statement(layout, pdf_path, pages, transactions_per_page, seed + i, notice_pages)
+        paths.append(pdf_path)
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("layout", choices=sorted(LAYOUTS))
+    parser.add_argument("folder")
+    parser.add_argument("--files", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--transactions", type=int, default=30, help="Transactions per page")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--notice-pages", type=int, default=0, help="Terms-and-conditions pages appended to each statement")
+    args = parser.parse_args()
+    paths = write_folder(args.layout, args.folder, args.files, args.pages, args.transactions, args.seed, args.notice_pages)
+    print(f"Wrote {len(paths)} statements to {args.folder}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from contextlib import nullcontext
+from datetime import datetime
+
+from mae_cache import DEFAULT_CACHE_SIZE_MB
+from mae_cli import build_parser, check_args, run
+from mae_engine import PROCESSING_MODES, AUTO_MODE, list_pdf_files, worker_pool
+from mae_export import OUTPUT_FORMATS
+
+
+# Options a job may set, as in mae_cli.py (dashes become underscores). Workers, the cache and
+# timings are set once for the whole batch.
+JOB_OPTIONS = ["export_path", "name", "format", "account", "sqlite", "incremental", "keep_duplicates"]
+# Paths in the job file are relative to the job file
+JOB_PATHS = ["source", "export_path", "sqlite"]
+
+def load_jobs(path):
+    """Read a job file (JSON, or YAML with PyYAML installed).
+
+    The file holds a list of jobs, or {"jobs": [...]} with optional "workers", "cache_dir" and
+    "report" settings for the batch. Each job needs "mode" and "source" and may have a "job" label
+    and any of JOB_OPTIONS. Returns (settings, jobs).
+    """
+    with open(path, encoding='utf-8') as f:
+        if path.lower().endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise RuntimeError("Reading YAML job files needs PyYAML (pip install pyyaml)")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+
+    settings = {} if isinstance(data, list) else dict(data)
+    jobs = data if isinstance(data, list) else settings.pop("jobs", None)
+    if not isinstance(jobs, list) or not jobs:
+        raise ValueError(f"{path} has no jobs")
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    for key in ("cache_dir", "report"):
+        if settings.get(key):
+            settings[key] = os.path.join(base_dir, settings[key])
+    for number, job in enumerate(jobs, 1):
+        if not isinstance(job, dict) or "mode" not in job or "source" not in job:
+            raise ValueError(f"Job {number} in {path} needs a mode and a source")
+        unknown = set(job) - set(JOB_OPTIONS) - {"job", "mode", "source"}
+        if unknown:
+            raise ValueError(f"Job {number} in {path} has unknown option(s): {', '.join(sorted(unknown))}")
+        for key in JOB_PATHS:
+            if job.get(key):
+                job[key] = os.path.join(base_dir, job[key])
+    return settings, jobs
+
+def job_args(job, cache_dir, cache_size_mb):
+    # The mae_cli.py options for one job
+    if job["mode"] not in PROCESSING_MODES and job["mode"] != AUTO_MODE:
+        raise ValueError(f"Unknown mode: {job['mode']}")
+    if job.get("format", "csv") not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown format: {job['format']} (use {', '.join(OUTPUT_FORMATS)})")
+    args = build_parser().parse_args([job["mode"], job["source"]])
+    for key in JOB_OPTIONS:
+        if key in job:
+            setattr(args, key, job[key])
+    args.cache_dir = cache_dir
+    args.cache_size = cache_size_mb
+    return args
+
+def run_jobs(jobs, workers=1, cache_dir=None, cache_size_mb=DEFAULT_CACHE_SIZE_MB):
+    """Run the jobs one after another in this process and return the run report.
+
+    With workers > 1 every job parses in the same process pool, so the worker processes are
+    started once for the whole batch. A job that fails is recorded in the report and the next
+    one still runs.
+    """
+    report = {"started": datetime.now().isoformat(timespec='seconds'), "workers": workers, "jobs": []}
+    start = time.perf_counter()
+    with worker_pool(workers, cache_dir, cache_size_mb) if workers > 1 else nullcontext():
+        for number, job in enumerate(jobs, 1):
+            label = job.get("job") or f"{job['mode']} {os.path.basename(os.path.normpath(job['source']))}"
+            print(f"\n[{number}/{len(jobs)}] {label}")
+            entry = {"job": label, "mode": job["mode"], "source": job["source"], "files": 0,
+                     "rows": 0, "outputs": [], "seconds": 0.0, "error": None}
+            job_start = time.perf_counter()
+            try:
+                args = job_args(job, cache_dir, cache_size_mb)
+                error = check_args(args)
+                if error is None and args.watch:
+                    error = "watch is not supported in a batch"
+                if error is not None:
+                    raise ValueError(error)
+                entry["files"] = len(list_pdf_files(args.source))
+                for mode, output, rows in run(args, workers):
+                    entry["outputs"].append({"mode": mode, "output": output, "rows": rows})
+                    entry["rows"] += rows
+            except Exception as e:
+                entry["error"] = str(e)
+                print(f"Job failed: {e}")
+            entry["seconds"] = round(time.perf_counter() - job_start, 3)
+            report["jobs"].append(entry)
+
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    report["files"] = sum(entry["files"] for entry in report["jobs"])
+    report["rows"] = sum(entry["rows"] for entry in report["jobs"])
+    report["failed"] = sum(entry["error"] is not None for entry in report["jobs"])
+    return report
+
+def print_report(report):
+    print(f"\n{'job':<32} {'mode':<20} {'files':>6} {'rows':>8} {'seconds':>8}  result")
+    for entry in report["jobs"]:
+        result = f"failed: {entry['error']}" if entry["error"] else ", ".join(o["output"] for o in entry["outputs"]) or "no data"
+        print(f"{entry['job'][:32]:<32} {entry['mode']:<20} {entry['files']:>6} {entry['rows']:>8} "
+              f"{entry['seconds']:>8.2f}  {result}")
+    print(f"{len(report['jobs'])} job(s), {report['failed']} failed, {report['files']} file(s), "
+          f"{report['rows']} rows in {report['seconds']:.2f}s")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run every job in a JSON/YAML job file (folder, mode, output) in one process and write a run report."
+    )
+    parser.add_argument("jobs", help="Job file (.json, or .yaml/.yml with PyYAML installed)")
+    parser.add_argument("-w", "--workers", type=int,
+                        help="Processes shared by all jobs (0 = one per CPU core; default: the job file's workers, or 1)")
+    parser.add_argument("--cache-dir", help="Text cache folder for all jobs (default: the job file's cache_dir)")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE_MB,
+                        help=f"Maximum cache size in MB (default: {DEFAULT_CACHE_SIZE_MB})")
+    parser.add_argument("--report", help="Write the run report as JSON to this file (default: the job file's report)")
+    args = parser.parse_args(argv)
+
+    try:
+        settings, jobs = load_jobs(args.jobs)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    workers = args.workers if args.workers is not None else settings.get("workers", 1)
+    workers = workers or os.cpu_count() or 1
+    report = run_jobs(jobs, workers, args.cache_dir or settings.get("cache_dir"), args.cache_size)
+    print_report(report)
+
+    report_path = args.report or settings.get("report")
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Run report written to {report_path}")
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Needed for the process pool in the PyInstaller build
+    sys.exit(main())
@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import fitz  # PyMuPDF
+
+
+DEFAULT_CACHE_SIZE_MB = 512
+
+def file_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class PageTextCache:
+    """On-disk cache of the text PyMuPDF extracts from each page of a PDF.
+
+    Entries are keyed by the SHA-256 of the file contents plus the PyMuPDF version, so a renamed
+    statement still hits and an upgraded PyMuPDF re-extracts everything. Each entry is one JSON
+    file; its modification time doubles as the last-used time for LRU eviction in prune().
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_CACHE_SIZE_MB * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def entry_path(self, digest):
+        return os.path.join(self.cache_dir, f"{digest}-{fitz.VersionBind}.json")
+
+    def get(self, digest):
+        path = self.entry_path(digest)
+        try:
+            with open(path, encoding='utf-8') as f:
+                pages = json.load(f)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        return pages
+
+    def put(self, digest, pages):
+        # Write to a temp file first so a worker process never reads a half-written entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(pages, f, ensure_ascii=False)
+            os.replace(tmp_path, self.entry_path(digest))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def prune(self):
+        """Delete the least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith('.json'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        return total
@@ -0,0 +1,174 @@
+import argparse
+import multiprocessing
+import os
+import sys
+
+from mae_cache import DEFAULT_CACHE_SIZE_MB
+from mae_engine import (PROCESSING_MODES, AUTO_MODE, process_folder, process_folder_by_template, template_file_name,
+                        export_folder_csv, export_folder_by_template_csv)
+from mae_export import OUTPUT_FORMATS, export_table
+from mae_incremental import process_folder_incremental
+from mae_profile import RunProfile, run_stage
+from mae_store import FingerprintIndex, open_store, upsert_transactions
+from mae_watch import watch_folder
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Process a folder of bank statement PDFs and export the transactions to CSV (no GUI)."
+    )
+    parser.add_argument("mode", choices=sorted(PROCESSING_MODES) + [AUTO_MODE],
+                        help=f"Statement layout to parse, or '{AUTO_MODE}' to detect it per file and write one output per layout")
+    parser.add_argument("source", help="Folder with the statement PDFs")
+    parser.add_argument("-o", "--export-path", help="Folder to write the CSV to (default: the source folder)")
+    parser.add_argument("-n", "--name", help="CSV file name without extension (default: the mode name; with auto, <name>_<mode>)")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="Number of processes to parse PDFs with (0 = one per CPU core, default: 1)")
+    parser.add_argument("--cache-dir", help="Folder to cache extracted PDF text in, so unchanged PDFs are not re-read on the next run")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE_MB,
+                        help=f"Maximum cache size in MB; least recently used entries are removed first (default: {DEFAULT_CACHE_SIZE_MB})")
+    parser.add_argument("-f", "--format", choices=OUTPUT_FORMATS, default="csv",
+                        help="csv (default), or a typed parquet/feather dataset partitioned by account, year and month")
+    parser.add_argument("--account", help="Account name for the partitioned formats (default: the file name)")
+    parser.add_argument("--sqlite", metavar="DB",
+                        help="Also upsert the transactions into this SQLite database (created if missing)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only parse PDFs not already in the CSV and append their rows (tracked in <name>.manifest.json)")
+    parser.add_argument("--keep-duplicates", action="store_true",
+                        help="Keep rows that already came from another statement (by default repeated downloads and overlapping statements are de-duplicated)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and append the rows of PDFs added to the source folder as they arrive (CSV only)")
+    parser.add_argument("--poll-interval", type=float, default=2.0,
+                        help="With --watch, seconds between folder scans when OS file events are unavailable (default: 2)")
+    parser.add_argument("--settle", type=float, default=2.0,
+                        help="With --watch, seconds a PDF must be unchanged before it is parsed (default: 2)")
+    parser.add_argument("--timings", metavar="FILE",
+                        help="Write per-file, per-stage wall times, line counts and rows as JSON lines to FILE ('-' for stdout)")
+    parser.add_argument("--timings-table", action="store_true",
+                        help="Print a per-stage timing summary and the slowest files at the end of the run")
+    parser.add_argument("--cprofile", action="store_true",
+                        help="Also run cProfile on every file and keep its top functions (implies --timings-table without --timings)")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Also record the peak Python memory of every file (implies --timings-table without --timings)")
+    return parser
+
+def report_timings(args, profile):
+    if profile is None:
+        return
+    if args.timings:
+        profile.write_jsonl(args.timings)
+    if args.timings_table or not args.timings:
+        profile.print_summary()
+
+def report_duplicates(duplicates):
+    if duplicates is not None and duplicates.skipped:
+        print(f"Skipped {duplicates.skipped} duplicate row(s) in total")
+
+def check_args(args):
+    # Returns what is wrong with a combination of options, or None
+    if not os.path.isdir(args.source):
+        return f"{args.source} is not a folder"
+    if args.incremental and args.format != "csv":
+        return "--incremental only supports CSV output"
+    if args.watch and args.format != "csv":
+        return "--watch only supports CSV output"
+    if args.watch:
+        # watch_folder() only appends to the CSV; these options would be silently ignored
+        ignored = [option for option, value in (("--sqlite", args.sqlite), ("--account", args.account),
+                                                ("--timings", args.timings), ("--timings-table", args.timings_table),
+                                                ("--cprofile", args.cprofile), ("--tracemalloc", args.tracemalloc))
+                   if value]
+        if ignored:
+            return f"{', '.join(ignored)} cannot be combined with --watch"
+    if args.incremental and args.mode == AUTO_MODE:
+        return f"--incremental needs a fixed mode, not {AUTO_MODE}"
+    if args.incremental and args.sqlite:
+        # The incremental run only appends to the CSV and never builds the rows for the database
+        return "--sqlite cannot be combined with --incremental"
+    return None
+
+def run(args, workers, profile=None):
+    """Process args.source as the options in args say; returns [(mode, output, rows written), ...]."""
+    export_path = args.export_path or args.source
+    excel_file_name = args.name or args.mode
+
+    if args.incremental:
+        rows = process_folder_incremental(args.source, args.mode, export_path, excel_file_name, workers=workers,
+                                          cache_dir=args.cache_dir, cache_size_mb=args.cache_size, profile=profile,
+                                          keep_duplicates=args.keep_duplicates)
+        return [(args.mode, os.path.join(export_path, f"{excel_file_name}.csv"), rows)]
+
+    # One index for the run; rows seen in an earlier statement are dropped as each file is read
+    duplicates = None if args.keep_duplicates else FingerprintIndex(args.account or excel_file_name)
+
+    if args.format == "csv" and not args.sqlite:
+        # Nothing else needs the combined frame, so each PDF's rows are written as soon as they are parsed
+        if args.mode == AUTO_MODE:
+            exported = export_folder_by_template_csv(args.source, export_path, args.name, workers=workers,
+                                                     cache_dir=args.cache_dir, cache_size_mb=args.cache_size, profile=profile,
+                                                     duplicates=duplicates)
+            results = [(mode, excel_path, rows) for mode, (excel_path, rows) in exported.items()]
+        else:
+            excel_path, rows = export_folder_csv(args.source, args.mode, export_path, excel_file_name, workers=workers,
+                                                 cache_dir=args.cache_dir, cache_size_mb=args.cache_size, profile=profile,
+                                                 duplicates=duplicates)
+            results = [] if excel_path is None else [(args.mode, excel_path, rows)]
+        report_duplicates(duplicates)
+        return results
+
+    if args.mode == AUTO_MODE:
+        frames = process_folder_by_template(args.source, workers=workers, cache_dir=args.cache_dir,
+                                            cache_size_mb=args.cache_size, profile=profile, duplicates=duplicates)
+        outputs = [(mode, combined_df, template_file_name(args.name, mode) if args.name else mode)
+                   for mode, combined_df in frames.items()]
+    else:
+        combined_df = process_folder(args.source, args.mode, workers=workers, cache_dir=args.cache_dir,
+                                     cache_size_mb=args.cache_size, profile=profile, duplicates=duplicates)
+        outputs = [] if combined_df is None else [(args.mode, combined_df, excel_file_name)]
+    report_duplicates(duplicates)
+
+    results = []
+    for mode, combined_df, file_name in outputs:
+        with run_stage(profile, "export"):
+            output = export_table(combined_df, mode, export_path, file_name, args.format, args.account)
+        results.append((mode, output, len(combined_df)))
+
+    if args.sqlite:
+        conn = open_store(args.sqlite)
+        try:
+            for mode, combined_df, file_name in outputs:
+                rows = upsert_transactions(conn, combined_df, mode, args.account or file_name)
+                print(f"Upserted {rows} transactions into {args.sqlite}")
+        finally:
+            conn.close()
+    return results
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    error = check_args(args)
+    if error is not None:
+        print(f"Error: {error}", file=sys.stderr)
+        return 2
+    workers = args.workers or os.cpu_count() or 1
+
+    if args.watch:
+        export_path = args.export_path or args.source
+        watch_folder(args.source, args.mode, export_path, args.name or (None if args.mode == AUTO_MODE else args.mode),
+                     poll_interval=args.poll_interval, settle_seconds=args.settle, workers=workers,
+                     cache_dir=args.cache_dir, cache_size_mb=args.cache_size, keep_duplicates=args.keep_duplicates)
+        return 0
+
+    profile = None
+    if args.timings or args.timings_table or args.cprofile or args.tracemalloc:
+        profile = RunProfile(cprofile=args.cprofile, trace_memory=args.tracemalloc)
+
+    results = run(args, workers, profile)
+    if not results and not args.incremental:
+        print("No data to export.")
+    report_timings(args, profile)
+    return 0 if results or args.incremental else 1
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Needed for the process pool in the PyInstaller build
+    sys.exit(main())
@@ -0,0 +1,1418 @@
+import fitz  # PyMuPDF
+import pandas as pd
+import numpy as np
+import re
+import os
+import csv
+import itertools
+import bisect
+import collections
+import contextlib
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from mae_cache import PageTextCache, DEFAULT_CACHE_SIZE_MB, file_digest
+from mae_profile import FileProfile, run_stage, profile_stage, profile_switch, profile_count, timed
+
+
+# List of strings to remove during processing
+strings_to_remove = [
+    "URUSNIAGA AKAUN/ 戶口進支項 /ACCOUNT TRANSACTIONS",
+    "TARIKH MASUK",
+    "BUTIR URUSNIAGA",
+    "JUMLAH URUSNIAGA",
+    "BAKI PENYATA",
+    "進支日期",
+    "進支項說明",
+    "银碼",
+    "結單存餘",
+    "URUSNIAGA AKAUN/ 戶口進支項/ACCOUNT TRANSACTIONS",
+    "TARIKH NILAI",
+    "仄過賬日期",
+    "戶號"
+]
+
+# Header strings dropped by the M2U debit parser (parse_m2u_debit_lines)
+m2u_strings_to_remove = [
+    'URUSNIAGA AKAUN/',
+    '戶口進支項',
+    '/ACCOUNT TRANSACTIONS',
+    'TARIKH MASUK',
+    'TARIKH NILAI',
+    'BUTIR URUSNIAGA',
+    'JUMLAH URUSNIAGA',
+    'BAKI PENYATA',
+    '進支日期',
+    '仄過賬日期',
+    '進支項說明',
+    '银碼',
+    '結單存餘',
+    'BEGINNING BALANCE'
+]
+
+def compile_line_filter(strings):
+    # One alternation regex, so each line is scanned once instead of once per string
+    return re.compile('|'.join(re.escape(s) for s in strings))
+
+line_filter = compile_line_filter(strings_to_remove)
+m2u_line_filter = compile_line_filter(m2u_strings_to_remove)
+
+class SectionStripper:
+    """Removes every (start marker, end marker) section of a template in a single pass.
+
+    Gives the same result as stripping the pairs one after another, each in its own pass over
+    the lines: a line only reaches a pair's markers if no earlier pair has consumed it.
+    """
+
+    def __init__(self, markers):
+        self.markers = markers
+        # Lets the common case (no open section, no marker on the line) skip the per-pair checks
+        self.marker_search = compile_line_filter(m for pair in markers for m in pair).search
+
+    def remove(self, lines):
+        return timed(self._remove(lines), "filter")
+
+    def _remove(self, lines):
+        in_section = [False] * len(self.markers)
+        open_sections = 0
+        marker_search = self.marker_search
+        for line in lines:
+            if not open_sections and not marker_search(line):
+                yield line
+                continue
+            for k, (start_marker, end_marker) in enumerate(self.markers):
+                if start_marker in line:
+                    open_sections += not in_section[k]
+                    in_section[k] = True
+                    break  # Skip the start marker line
+                elif end_marker in line:
+                    open_sections -= in_section[k]
+                    in_section[k] = False
+                    break  # Skip the end marker line
+                elif in_section[k]:
+                    break
+            else:
+                yield line
+
+# Sections (start marker, end marker) to strip for each statement template
+maybank_debit_sections = SectionStripper([
+    ('Maybank Islamic Berhad', 'Please notify us of any change of address in writing.'),
+    ('15th Floor, Tower A, Dataran Maybank, 1, Jalan Maarof, 59000 Kuala Lumpur', '請通知本行在何地址更换。'),
+    ('ENTRY DATE', 'STATEMENT BALANCE'),
+    ('ENDING BALANCE :', 'TOTAL DEBIT :'),
+])
+m2u_sections = SectionStripper([
+    ('Malayan Banking Berhad (3813-K)', 'denoted by DR'),
+    ('FCN', 'PLEASE BE INFORMED TO CHECK YOUR BANK ACCOUNT BALANCES REGULARLY'),
+    ('ENTRY DATE', 'STATEMENT BALANCE'),
+    ('ENDING BALANCE :', 'TOTAL CREDIT :'),
+])
+cimb_sections = SectionStripper([
+    ('Page / Halaman', 'ISLAMIC BBB-PPPP'),
+])
+
+# Column headers printed on every page that has transactions; other pages are not extracted.
+# The credit card and CIMB statements have no header that is on all such pages and only there.
+maybank_page_markers = ["ENTRY DATE"]
+rhb_page_markers = ["Date Branch Description"]
+
+def filter_lines(lines, pattern=line_filter):
+    # Drops every line containing one of the strings the pattern was compiled from
+    search = pattern.search
+    return timed((line for line in lines if not search(line)), "filter", "lines_kept")
+
+def parse_amount_column(values):
+    # '1,234.56' -> 1234.56; anything that is not a number (e.g. '-') becomes NaN
+    return pd.to_numeric(values.astype(str).str.replace(',', '', regex=False), errors='coerce')
+
+def determine_flow(transaction_amount):
+    if transaction_amount.endswith('+'):
+        return 'Deposit'
+    elif transaction_amount.endswith('-'):
+        return 'Withdrawal'
+    else:
+        return 'unknown'
+
+# Set by configure_text_cache(); None means every run extracts the text again
+text_cache = None
+
+def configure_text_cache(cache_dir, cache_size_mb=DEFAULT_CACHE_SIZE_MB):
+    global text_cache
+    text_cache = PageTextCache(cache_dir, cache_size_mb * 1024 * 1024) if cache_dir else None
+
+def extract_pages(doc, page_markers=None):
+    try:
+        for page in doc:
+            profile_count("pages")
+            with profile_stage("extract"):
+                if not page_markers:
+                    text = page.get_text()
+                else:
+                    # The search runs on the TextPage the text is read from, so kept pages cost nothing extra
+                    textpage = page.get_textpage(flags=fitz.TEXTFLAGS_TEXT)
+                    if not any(textpage.search(marker) for marker in page_markers):
+                        profile_count("pages_pruned")
+                        continue
+                    text = page.get_text(textpage=textpage)
+            yield text
+    finally:
+        doc.close()
+
+def iter_pdf_pages(pdf_path, page_markers=None):
+    """Yield the text of one page at a time.
+
+    With page_markers, pages on which none of the markers appear (terms and conditions, notices)
+    are dropped before their text is read out, so the parsers never see them.
+    """
+    if text_cache is None:
+        with profile_stage("open"):
+            doc = fitz.open(pdf_path)
+        yield from extract_pages(doc, page_markers)
+        return
+
+    with profile_stage("cache"):
+        with open(pdf_path, 'rb') as f:
+            data = f.read()
+        digest = file_digest(data)
+        if page_markers:
+            # Pruned text is cached apart from the full text of the same file
+            digest += '-' + file_digest('\n'.join(page_markers).encode('utf-8'))[:12]
+        pages = text_cache.get(digest)
+    if pages is not None:
+        profile_count("pages", len(pages))
+        yield from pages
+        return
+
+    with profile_stage("open"):
+        doc = fitz.open(stream=data, filetype='pdf')
+    pages = []
+    for text in extract_pages(doc, page_markers):
+        pages.append(text)
+        yield text
+    with profile_stage("cache"):
+        text_cache.put(digest, pages)
+
+def iter_pdf_lines(pdf_path, page_markers=None):
+    """Yield the lines of the PDF page by page.
+
+    Gives the same lines as joining every page's text and calling split('\\n'): a page that does
+    not end in a newline carries its last line over to the next page. See iter_pdf_pages() for
+    page_markers.
+    """
+    return timed(split_pages(iter_pdf_pages(pdf_path, page_markers)), "split", "lines")
+
+def split_pages(pages):
+    tail = ""
+    for text in pages:
+        lines = (tail + text).split('\n')
+        tail = lines.pop()
+        yield from lines
+    yield tail
+
+def list_pdf_files(folder_path):
+    # Sorted so that the combined output has the same row order on every run
+    return sorted(os.path.join(folder_path, file) for file in os.listdir(folder_path) if file.endswith('.pdf'))
+
+def find_m2u_debit_year(lines, context):
+    # Header hook: runs on the stripped, non-empty lines before the sections are removed
+    debug = context.get("debug", False)
+    pdf_path = context["pdf_path"]
+    if debug:
+        print(f"Total lines before processing: {len(lines)}")
+
+    # Enhanced year extraction
+    year_statement = None
+    date_pattern = re.compile(r'\d{2}/\d{2}/\d{2}')
+
+    # First try: Look for date after "STATEMENT DATE"
+    for i, line in enumerate(lines):
+        if "STATEMENT DATE" in line:
+            # Check next few lines for the date
+            for j in range(i, min(i + 5, len(lines))):
+                if date_pattern.search(lines[j]):
+                    full_date = date_pattern.search(lines[j]).group(0)
+                    year_statement = full_date.split('/')[-1]
+                    if debug:
+                        print(f"Found statement year (method 1): {year_statement}")
+                    break
+            break
+
+    if not year_statement:
+        # Second try: Look for any date pattern
+        for line in lines:
+            match = date_pattern.search(line)
+            if match:
+                full_date = match.group(0)
+                year_statement = full_date.split('/')[-1]
+                if debug:
+                    print(f"Found statement year (method 2): {year_statement}")
+                break
+
+        # Third try: Extract from filename
+        if not year_statement:
+            filename_pattern = re.compile(r'(\d{4})(?=\d{2})')
+            match = filename_pattern.search(pdf_path)
+            if match:
+                year_statement = match.group(1)[2:]  # Get last 2 digits of year
+                if debug:
+                    print(f"Found statement year from filename: {year_statement}")
+
+    if not year_statement:
+        raise ValueError("Could not find statement year")
+    context["year"] = year_statement
+    return lines
+
+def parse_m2u_debit_lines(filtered_lines, context):
+    year_statement = context["year"]
+
+    # Process transactions
+    date_pattern = re.compile(r'\d{2}/\d{2}')
+    amount_pattern = re.compile(r'(\d{1,3}(?:,\d{3})*(?:\.\d{2})?(?:[+-])?|\d+(?:\.\d{2})?(?:[+-])?)')
+    # One list per column; the transaction being read is kept in locals until the next date
+    dates, descriptions, transaction_amounts, balances = [], [], [], []
+    entry_date = None
+    transaction_amount = statement_balance = None
+    description_lines = []
+
+    def save_entry():
+        if entry_date is not None and description_lines:
+            dates.append(entry_date)
+            descriptions.append(" ".join(description_lines).strip())
+            transaction_amounts.append(transaction_amount)
+            balances.append(statement_balance)
+
+    for line in filtered_lines:
+        line = line.strip()
+
+        # Start new entry if we find a date
+        if date_pattern.match(line):
+            save_entry()
+            entry_date = line
+            transaction_amount = statement_balance = None
+            description_lines = []
+            continue
+
+        if entry_date is None:
+            continue
+
+        # Try to identify amounts
+        amounts = amount_pattern.findall(line)
+        is_amount = bool(amounts and any(amt.replace(',', '').replace('.', '').replace('+', '').replace('-', '').isdigit() for amt in amounts))
+
+        if is_amount:
+            amount_str = amounts[0]
+            if '+' in line or '-' in line:
+                if not transaction_amount:
+                    transaction_amount = amount_str
+                    continue
+            elif transaction_amount and not statement_balance:
+                statement_balance = amount_str
+                continue
+
+        # If not an amount or not used as amount, add to description
+        description_lines.append(line)
+
+    # Don't forget the last entry
+    save_entry()
+
+    profile_switch("dataframe")
+    df = pd.DataFrame({
+        "Entry Date": dates,
+        "Transaction Description": descriptions,
+        "Transaction Amount": transaction_amounts,
+        "Statement Balance": balances,
+    })
+
+    if df.empty:
+        raise ValueError("No transactions were extracted from the PDF")
+
+    # Process dates
+    df['Entry Date'] = pd.to_datetime(df['Entry Date'] + '/' + year_statement, format='%d/%m/%y', dayfirst=True)
+
+    # Clean amounts and determine flow
+    def clean_amount(val):
+        if pd.isna(val) or val is None or val == '':
+            return None
+        # Remove everything except digits, decimal point, and signs
+        clean_val = re.sub(r'[^\d.,+-]', '', str(val))
+        if not clean_val:
+            return None
+        return clean_val
+
+    df['Transaction Amount'] = df['Transaction Amount'].apply(clean_amount)
+    df['Statement Balance'] = df['Statement Balance'].apply(clean_amount)
+
+    # Add flow column
+    df['flow'] = df['Transaction Amount'].apply(lambda x: 'inflow' if x and '+' in str(x) else 'outflow' if x else None)
+
+    # Final cleanup of amounts
+    df['Transaction Amount'] = df['Transaction Amount'].apply(lambda x: float(re.sub(r'[^\d.]', '', str(x))) if x else None)
+    df['Statement Balance'] = df['Statement Balance'].apply(lambda x: float(re.sub(r'[^\d.]', '', str(x))) if x else None)
+
+    # Drop rows where Transaction Amount is None
+    df = df.dropna(subset=['Transaction Amount'])
+
+    return df
+
+def parse_cc_lines(lines, context):
+    # Extract the year from the filename
+    pattern = re.compile(r"\d{4}")
+    yearlist = pattern.findall(os.path.basename(context["pdf_path"]))
+    year = None
+
+    for years in yearlist:
+        if ((int(years) > 2010) and (int(years) < 2050)):
+            year = years
+
+    # The parser below looks ahead by index, so this is the one list built from the PDF
+    data = list(lines)
+
+    transaction_dates, posting_dates, descriptions, amounts = [], [], [], []
+    i = 0
+    while i < len(data):
+        if '/' in data[i] and len(data[i]) == 5 and i + 1 < len(data) and '/' in data[i + 1] and len(data[i + 1]) == 5:
+            transaction_date = data[i]
+            posting_date = data[i + 1]
+            i += 2
+
+            description = []
+            amount = ''
+
+            while i < len(data) and not ('/' in data[i] and len(data[i]) == 5):
+                clean_line = data[i].strip()
+                amount_match = re.match(r'^(\d{1,3}(?:,\d{3})*(\.\d{2})?)(CR)?$', clean_line, re.IGNORECASE)
+                if amount_match:
+                    amount = amount_match.group(1)
+                    if amount_match.group(3):
+                        amount = '-' + amount
+                    i += 1
+                    break
+                else:
+                    description.append(clean_line)
+                i += 1
+
+            transaction_dates.append(transaction_date)
+            posting_dates.append(posting_date)
+            descriptions.append(', '.join(description))
+            amounts.append(amount)
+        else:
+            i += 1
+
+    if not transaction_dates:
+        return None
+    profile_switch("dataframe")
+    # The first date of a row has always been exported as 'Posting Date'
+    return pd.DataFrame({
+        'Posting Date': transaction_dates,
+        'Transaction Date': posting_dates,
+        'Transaction Description': descriptions,
+        'Amount': amounts,
+        'Year': year,
+    })
+
+def finalize_cc_statement(combined_df):
+    combined_df['Amount'] = combined_df['Amount'].str.replace(',', '').replace('', None).astype(float)
+    combined_df['Year'] = combined_df['Year'].astype('Int64')
+    return combined_df[['Year', 'Posting Date', 'Transaction Date', 'Transaction Description', 'Amount']]
+
+def maybank_line_columns(transactions, date_pattern):
+    """Frame of the raw Maybank/M2U transaction fields, read line by line.
+
+    After each date line the first line is the transaction type, the next the amount, and the
+    rest the description (balances included, taken out later). Each field is kept in its own
+    list, with the description lines joined once per transaction.
+    """
+    dates, types, fragments, amounts = [], [], [], []
+    for line in transactions:
+        if date_pattern.match(line):
+            dates.append(line)
+            types.append("")
+            amounts.append("")
+            fragments.append([])
+        elif dates and types[-1] and amounts[-1] == "":
+            amounts[-1] = line.strip()
+        elif dates and types[-1] == "":
+            types[-1] = line.strip()
+        elif dates:
+            fragments[-1].append(line.strip())
+
+    profile_switch("dataframe")
+    return pd.DataFrame({
+        "Entry Date": dates,
+        "Transaction Description": [', '.join(parts).rstrip(', ') for parts in fragments],
+        "Transaction Amount": types,
+        "Statement Balance": amounts,
+    })
+
+def find_m2u_current_year(lines, context):
+    # Header hook: only the lines up to the first full date are held back while looking for the year
+    date_pattern = re.compile(r'\d{2}/\d{2}/\d{2}')
+    year_statement = "00"
+    head_lines = []
+    for line in lines:
+        head_lines.append(line)
+        if date_pattern.match(line):
+            year_match = re.match(r'(\d{2})/(\d{2})/(\d{2})', line)
+            if year_match:
+                year_statement = year_match.group(3)
+            break
+    context["year"] = year_statement
+    return itertools.chain(head_lines, lines)
+
+def parse_m2u_current_lines(transactions, context):
+    year_statement = context["year"]
+    df = maybank_line_columns(transactions, re.compile(r'\d{2}/\d{2}'))
+    df['Entry Date'] = pd.to_datetime(df['Entry Date'], format='%d/%m', dayfirst=True).dt.date
+    df['Entry Date'] = df['Entry Date'].apply(lambda x: x.replace(year = 2000 + int(year_statement)))
+
+    df['Statement Balance 2'] = df['Transaction Description'].str.extract(r'(\d+,\d+\.\d+)')[0]
+    df['Statement Balance 2'] = df['Statement Balance 2'].str.replace(',', '').astype(float)
+
+    df['Transaction Description'] = df['Transaction Description'].str.replace(r'\d+,\d+\.\d+, ', '', regex=True)
+    df['Transaction Description'] = df['Transaction Description'].str.replace(r', (\d{1,3}(?:,\d{3})*(?:\.\d{2}))$', '', regex=True)
+
+    df = df[['Entry Date', 'Transaction Amount', 'Transaction Description', 'Statement Balance', 'Statement Balance 2']]
+    df = df.rename(columns={'Transaction Amount': 'Transaction Type', 'Statement Balance': 'Transaction Amount', 'Statement Balance 2': 'Statement_Balance'})
+    df.loc[df['Transaction Type'] == 'CASH WITHDRAWAL', 'Transaction Description'] = 'CASH WITHDRAWAL'
+    df.loc[df['Transaction Type'] == 'DEBIT ADVICE', 'Transaction Description'] = 'Card Annual Fee'
+    df.loc[df['Transaction Type'] == 'PROFIT PAID', 'Transaction Description'] = 'PROFIT PAID'
+
+    df.loc[df['Transaction Type'] == 'INTEREST PAYMENT', 'Transaction Description'] = 'INTEREST PAYMENT'
+    df.loc[df['Transaction Type'] == 'INT ON INT PAYMENT', 'Transaction Description'] = 'INT ON INT PAYMENT'
+
+    df['flow'] = df['Transaction Amount'].apply(determine_flow)
+    df['Transaction Amount'] = df['Transaction Amount'].str.replace('+', '', regex=False).str.replace('-', '', regex=False)
+    df['Transaction Amount'] = df['Transaction Amount'].str.replace(',', '').astype(float)
+
+    return df
+
+def parse_debit_lines(transactions, context):
+    df = maybank_line_columns(transactions, re.compile(r'\d{2}/\d{2}/\d{2}'))
+    df['Entry Date'] = pd.to_datetime(df['Entry Date'], format='%d/%m/%y', dayfirst=True).dt.date
+    df['Statement Balance 2'] = df['Transaction Description'].str.extract(r'(\d+,\d+\.\d+)')[0]
+    df['Statement Balance 2'] = df['Statement Balance 2'].str.replace(',', '').astype(float)
+
+    df['Transaction Description'] = df['Transaction Description'].str.replace(r'\d+,\d+\.\d+, ', '', regex=True)
+    df['Transaction Description'] = df['Transaction Description'].str.replace(r', (\d{1,3}(?:,\d{3})*(?:\.\d{2}))$', '', regex=True)
+
+    df = df[['Entry Date', 'Transaction Amount', 'Transaction Description', 'Statement Balance', 'Statement Balance 2']]
+    df = df.rename(columns={'Transaction Amount': 'Transaction Type', 'Statement Balance': 'Transaction Amount', 'Statement Balance 2': 'Statement_Balance'})
+    df.loc[df['Transaction Type'] == 'CASH WITHDRAWAL', 'Transaction Description'] = 'CASH WITHDRAWAL'
+    df.loc[df['Transaction Type'] == 'DEBIT ADVICE', 'Transaction Description'] = 'Card Annual Fee'
+    df.loc[df['Transaction Type'] == 'PROFIT PAID', 'Transaction Description'] = 'PROFIT PAID'
+    df['flow'] = df['Transaction Amount'].apply(determine_flow)
+    df['Transaction Amount'] = df['Transaction Amount'].str.replace('+', '', regex=False).str.replace('-', '', regex=False)
+    df['Transaction Amount'] = df['Transaction Amount'].str.replace(',', '').astype(float)
+
+    return df
+
+class TableLayout:
+    """Reads a template's transaction table from word positions instead of the flattened page text.
+
+    On each page the column headers are located with search_for(), and only the words in the
+    clip area below them are used. Words are grouped into visual lines by their baseline and each
+    word goes to the column whose header it sits under, so page headers, address blocks and
+    footers are never parsed. A page without the headers has no table and is skipped. The table
+    on a page ends at the first line starting with one of the end markers.
+    """
+
+    def __init__(self, columns, end_markers, pattern=line_filter):
+        self.columns = columns  # [(column name, header text)], left to right
+        self.names = [name for name, _ in columns]
+        self.anchor = max(range(len(columns)), key=lambda i: len(columns[i][1]))
+        self.end_markers = tuple(end_markers)
+        self.search = pattern.search
+
+    def page_columns(self, page, textpage):
+        # Left edges of the columns after the first and the bottom of the header row, or None without a table
+        column_hits = []
+        for _, label in self.columns:
+            hits = page.search_for(label, textpage=textpage)
+            if not hits:
+                return None
+            column_hits.append(hits)
+        # Short headers such as "Date" also turn up elsewhere on the page, so each column takes the hit
+        # on the same row as the longest header
+        row = column_hits[self.anchor][0].y1
+        header = [min(hits, key=lambda rect: abs(rect.y1 - row)) for hits in column_hits]
+        # Split the gap between neighbouring headers; left-aligned text and right-aligned amounts both fit
+        edges = [(left.x1 + right.x0) / 2 for left, right in zip(header, header[1:])]
+        return edges, max(rect.y1 for rect in header)
+
+    def page_rows(self, page):
+        with profile_stage("extract"):
+            # One TextPage serves both the header search and the words
+            textpage = page.get_textpage()
+            found = self.page_columns(page, textpage)
+            if found is None:
+                return
+            edges, header_bottom = found
+            clip = fitz.Rect(page.rect.x0, header_bottom + 1, page.rect.x1, page.rect.y1)
+            words = [word for word in page.get_text("words", textpage=textpage)
+                     if clip.y0 <= (word[1] + word[3]) / 2 <= clip.y1]
+
+        # Group words into lines by baseline, then each line into cells by x
+        words.sort(key=lambda word: (word[3], word[0]))
+        visual_lines = []
+        for word in words:
+            if visual_lines and word[3] - visual_lines[-1][0] <= 2:
+                visual_lines[-1][1].append(word)
+            else:
+                visual_lines.append((word[3], [word]))
+        profile_count("lines", len(visual_lines))
+
+        names = self.names
+        for _, line_words in visual_lines:
+            line_words.sort(key=lambda word: word[0])
+            text = ' '.join(word[4] for word in line_words)
+            if text.startswith(self.end_markers):
+                return
+            if self.search(text):
+                continue
+            cells = {}
+            for x0, _, x1, _, word, *_ in line_words:
+                name = names[bisect.bisect_right(edges, (x0 + x1) / 2)]
+                cells[name] = cells[name] + ' ' + word if name in cells else word
+            yield cells
+
+    def rows(self, doc):
+        """Yield a {column name: text} dict for every line of the table, page by page."""
+        for page in doc:
+            profile_count("pages")
+            yield from self.page_rows(page)
+
+# Column headers shared by the Maybank savings/current and M2U statements
+maybank_table_columns = [
+    ("date", "ENTRY DATE"),
+    ("description", "TRANSACTION DESCRIPTION"),
+    ("amount", "TRANSACTION AMOUNT"),
+    ("balance", "STATEMENT BALANCE"),
+]
+maybank_debit_table = TableLayout(maybank_table_columns, ["ENDING BALANCE :", "TOTAL DEBIT :"])
+m2u_table = TableLayout(maybank_table_columns, [
+    "ENDING BALANCE :", "TOTAL CREDIT :", "FCN", "PLEASE BE INFORMED TO CHECK YOUR BANK ACCOUNT BALANCES REGULARLY",
+])
+
+# Transaction types whose description is replaced by a fixed text
+maybank_debit_type_descriptions = {
+    'CASH WITHDRAWAL': 'CASH WITHDRAWAL',
+    'DEBIT ADVICE': 'Card Annual Fee',
+    'PROFIT PAID': 'PROFIT PAID',
+}
+m2u_type_descriptions = dict(maybank_debit_type_descriptions, **{
+    'INTEREST PAYMENT': 'INTEREST PAYMENT',
+    'INT ON INT PAYMENT': 'INT ON INT PAYMENT',
+})
+
+def parse_maybank_table(rows, date_pattern, type_descriptions):
+    # The first description line of a transaction is its type; the lines below it are the description
+    dates, types, descriptions, amounts, balances = [], [], [], [], []
+    for cells in rows:
+        date_match = date_pattern.match(cells.get("date", ""))
+        if date_match:
+            dates.append(date_match.group())
+            types.append(cells.get("description", ""))
+            descriptions.append([])
+            amounts.append(cells.get("amount", ""))
+            balances.append(cells.get("balance", ""))
+        elif dates and "description" in cells:
+            descriptions[-1].append(cells["description"])
+    if not dates:
+        return None
+
+    profile_switch("dataframe")
+    df = pd.DataFrame({
+        'Entry Date': dates,
+        'Transaction Type': types,
+        'Transaction Description': [', '.join(fragments) for fragments in descriptions],
+        'Transaction Amount': amounts,
+        'Statement_Balance': balances,
+    })
+    for transaction_type, description in type_descriptions.items():
+        df.loc[df['Transaction Type'] == transaction_type, 'Transaction Description'] = description
+
+    df['flow'] = df['Transaction Amount'].apply(determine_flow)
+    df['Transaction Amount'] = parse_amount_column(df['Transaction Amount'].str.rstrip('+-'))
+    df['Statement_Balance'] = parse_balance_column(df['Statement_Balance'])
+    return df
+
+def parse_balance_column(values):
+    # Overdrawn balances are printed with a DR suffix
+    balance = values.str.rstrip('DR ')
+    return parse_amount_column(balance).where(balance == values, -parse_amount_column(balance))
+
+def parse_debit_table(doc, context):
+    df = parse_maybank_table(maybank_debit_table.rows(doc), re.compile(r'\d{2}/\d{2}/\d{2}\b'),
+                             maybank_debit_type_descriptions)
+    if df is not None:
+        df['Entry Date'] = pd.to_datetime(df['Entry Date'], format='%d/%m/%y').dt.date
+    return df
+
+def find_m2u_table_year(doc):
+    # The year is only on the statement date (DD/MM/YY) near the top of the first page; None if it is not there
+    for word in doc[0].get_text("words") if doc.page_count else []:
+        year_match = re.fullmatch(r'\d{2}/\d{2}/(\d{2})', word[4])
+        if year_match:
+            return year_match.group(1)
+    return None
+
+def parse_m2u_current_table(doc, context):
+    year_statement = find_m2u_table_year(doc) or "00"
+    df = parse_maybank_table(m2u_table.rows(doc), re.compile(r'\d{2}/\d{2}\b'), m2u_type_descriptions)
+    if df is not None:
+        df['Entry Date'] = pd.to_datetime(df['Entry Date'] + '/' + year_statement, format='%d/%m/%y').dt.date
+    return df
+
+def parse_m2u_debit_table(doc, context):
+    # Same columns as parse_m2u_debit_lines(): the description is every description line, type included
+    year_statement = find_m2u_table_year(doc)
+    if year_statement is None:
+        # Like find_m2u_debit_year(), fall back to the year in the file name
+        year_match = re.search(r'(\d{4})(?=\d{2})', context["pdf_path"])
+        if not year_match:
+            raise ValueError("Could not find statement year")
+        year_statement = year_match.group(1)[2:]
+
+    date_pattern = re.compile(r'\d{2}/\d{2}\b')
+    dates, descriptions, amounts, balances = [], [], [], []
+    for cells in m2u_table.rows(doc):
+        date_match = date_pattern.match(cells.get("date", ""))
+        if date_match:
+            dates.append(date_match.group())
+            descriptions.append([cells["description"]] if "description" in cells else [])
+            amounts.append(cells.get("amount", ""))
+            balances.append(cells.get("balance", ""))
+        elif dates and "description" in cells:
+            descriptions[-1].append(cells["description"])
+    if not dates:
+        return None
+
+    profile_switch("dataframe")
+    df = pd.DataFrame({
+        'Entry Date': dates,
+        'Transaction Description': [' '.join(fragments) for fragments in descriptions],
+        'Transaction Amount': amounts,
+        'Statement Balance': balances,
+    })
+    df['Entry Date'] = pd.to_datetime(df['Entry Date'] + '/' + year_statement, format='%d/%m/%y')
+    df['flow'] = np.where(df['Transaction Amount'].str.endswith('+'), 'inflow', 'outflow')
+    df['Transaction Amount'] = parse_amount_column(df['Transaction Amount'].str.rstrip('+-'))
+    df['Statement Balance'] = parse_balance_column(df['Statement Balance'])
+    # Lines with a date but no amount are not transactions
+    return df.dropna(subset=['Transaction Amount'])
+
+cimb_date_pattern = re.compile(r'\d{2}/\d{2}/\d{4}')
+cimb_amount_pattern = re.compile(r'^-?\d')
+
+def is_pure_number(s):
+    # Remove spaces for the check
+    s = s.replace(' ', '')
+    # Check if the string is numeric and does not contain '.' or ','
+    return s.isnumeric() and not any(c in s for c in ".,")
+
+def normalise_cimb_lines(lines):
+    """Single pass over the filtered CIMB lines.
+
+    - A date line less than 4 lines after the last kept date is a repeated value date and is dropped
+    - Pure numbers (reference numbers) are dropped
+    - "99 SPEEDMART-2133" is renamed so its leading digits are not read as an amount
+    """
+    next_date_index = 0
+    for i, line in enumerate(lines):
+        if cimb_date_pattern.match(line):
+            if i < next_date_index:
+                continue
+            next_date_index = i + 4
+        elif is_pure_number(line):
+            continue
+        elif line == "99 SPEEDMART-2133":
+            line = "ninetynine speed mart"
+        yield line
+
+def parse_cimb_lines(lines, context):
+    # The parser below looks ahead by index, so this is the one list built from the PDF
+    data = list(normalise_cimb_lines(lines))
+
+    dates, details, amounts, balances, payees = [], [], [], [], []
+
+    i = 0
+    while i < len(data):
+        if data[i] == 'OPENING BALANCE':
+            dates.append('-')
+            details.append('Opening Balance')
+            i += 1
+            balances.append('-')
+            amounts.append(data[i].strip())
+            payees.append('-')
+            i += 1
+        elif cimb_date_pattern.match(data[i]):
+            dates.append(data[i])
+            i += 1
+
+            description_lines = []
+            while i < len(data) and not cimb_date_pattern.match(data[i]) and not cimb_amount_pattern.match(data[i].strip()):
+                if data[i].strip():
+                    description_lines.append(data[i].strip())
+                i += 1
+
+            details.append(', '.join(description_lines))
+
+            if i < len(data) and cimb_amount_pattern.match(data[i].strip()):
+                amounts.append(data[i].strip())
+                i += 1
+            else:
+                amounts.append(None)
+
+            balance_line = data[i].strip() if i < len(data) else ""
+            while not balance_line and i < len(data):
+                i += 1
+                balance_line = data[i].strip() if i < len(data) else ""
+            balances.append(balance_line)
+            payees.append(description_lines[0] if description_lines else '-')
+        else:
+            i += 1
+
+    if not dates:
+        return None
+
+    profile_switch("dataframe")
+    descriptions2 = [' '.join(text.split()[1:]) for text in details]
+    df = pd.DataFrame({
+        'Date': dates,
+        'Amount': amounts,
+        'Balance After Transaction': balances,
+        'Transaction Description2': descriptions2,
+        'Transaction Description': [f"{text}, {payee}" for text, payee in zip(descriptions2, payees)],
+    })
+    df['Amount'] = parse_amount_column(df['Amount'])
+    df['Balance After Transaction'] = parse_amount_column(df['Balance After Transaction'])
+
+    # A row is a deposit if the balance went up since the previous row. The opening balance row
+    # has no balance of its own, so its amount is the starting point.
+    running_balance = df['Balance After Transaction'].mask(df['Date'] == '-', df['Amount'])
+    df['output'] = np.where(running_balance.diff() > 0, 'deposit', 'withdrawal')
+    df['output'] = df['output'].where(df.index > 0)  # Nothing to compare the first row with
+    return df
+
+def finalize_CIMB_statement(combined_df):
+    combined_df['Transaction Description2'] = combined_df['Transaction Description2'].replace('Balance', 'Opening Balance')
+    combined_df['Transaction Description'] = combined_df['Transaction Description2'].replace('Balance, -', 'Opening Balance')
+    combined_df[['Date', 'Transaction Type']] = combined_df['Date'].str.extract(r'(\S+)\s(.*)')
+    return combined_df[['Date', 'Transaction Type', 'Transaction Description', 'Transaction Description2','Amount', 'Balance After Transaction','output']]
+
+# RHB Flex transaction types; the first one in this list found in a row is its description
+rhb_transaction_types = [
+    'DUITNOW QR POS CR', 'INWARD IBG', 'RFLX', 'DUITNOW',
+    'RPP INWARD INST TRF', 'LOCAL CHQ', 'REFLEX-FUNDS TFR DR',
+    'MB FUND', 'CASH DEPOSIT', 'RPP INWARD', 'REFLEX-FUNDS TFR',
+    'REFLEX- FUNDS TFR DR', 'RFLX INSTANT TRF DR', 'RFLX INSTANT TRF SC'
+]
+
+# One lookahead per type, tried in list order, so list order (not position in the row) decides
+rhb_transaction_type_pattern = re.compile(
+    '^(?:' + '|'.join(f'(?=.*?({re.escape(t)}))' for t in rhb_transaction_types) + ')'
+)
+
+# Text before an amount with DR or CR or +/- at the end of the row
+rhb_amount_pattern = re.compile(r'^(.*?)([\d,]+\.\d{2})\s*(DR|CR|\+|\-)?$')
+
+# Balance (a number ending with '+') followed by the sender/beneficiary text
+rhb_balance_pattern = re.compile(r'^([\d,]+\.\d{2}\+)\s*(.*)')
+
+# Whole reference tokens to drop: 8+ characters mixing letters and digits, exactly 3 digits, or 8+ digits
+rhb_reference_token_pattern = re.compile(r'(?<!\S)(?:(?=\S*[A-Za-z])(?=\S*\d)\S{8,}|\d{3}|\d{8,})(?!\S)')
+
+# Noise left in the recipient reference by page headers and footers
+rhb_reference_noise_pattern = re.compile('|'.join([
+    r'06/\s*\d+\s*/\s*-\s*',       # Matches '06/ 6 / -'
+    r'/\s*\d{3,}\s*/\s*-\s*',      # Matches '/ 5508/ -', '/ 4621/ -'
+    r'www\.rhbgroup\.com.*',       # Matches from 'www.rhbgroup.com' onwards
+    r'For Any Enquiries.*',        # Matches 'For Any Enquiries...'
+    r'Date Branch Description.*',  # Matches 'Date Branch Description...'
+    r'Reference 1 / Recipient\'s Reference.*',
+    r'Reference 2 / Other Payment Details.*',
+    r'RefNum.*',
+    r'Amount \(DR\).*',
+    r'Amount \(CR\).*',
+    r'Balance Sender\'s / Beneficiary\'s Name.*',
+    r'Sender\'s / Beneficiary\'s Name.*',
+]), flags=re.IGNORECASE)
+
+def collapse_whitespace(values):
+    return values.str.replace(r'\s+', ' ', regex=True).str.strip()
+
+def parse_rhb_flex_pages(pages, context):
+    # Dates and text of each transaction
+    dates = []
+    texts = []
+    current_lines = None
+
+    # Process each page
+    for text in pages:
+        # Split text into lines
+        lines = text.split('\n')
+        profile_count("lines", len(lines))
+
+        for line in lines:
+            line = line.strip()
+            # Match date pattern DD-MM-YYYY or DD-MM-YY
+            date_match = re.match(r'(\d{2}-\d{2}-\d{4}|\d{2}-\d{2}-\d{2})', line)
+            if date_match:
+                # Start of new transaction
+                if current_lines is not None:
+                    # Add the previous transaction to the list
+                    texts.append(' '.join(current_lines).strip())
+                # Create new transaction
+                dates.append(date_match.group(1))
+                current_lines = []
+            elif current_lines is not None:
+                # Add line to current transaction
+                current_lines.append(line)
+            else:
+                # Line before the first date, skip or handle as needed
+                pass
+    # Add the last transaction
+    if current_lines is not None:
+        texts.append(' '.join(current_lines).strip())
+
+    # 'string' dtype keeps the .str methods working when a column has no matches at all
+    combined_text = pd.Series(texts, dtype='string')
+
+    # Extract amount with DR or CR or +/- at the end, and remove it from the text
+    amount_parts = combined_text.str.extract(rhb_amount_pattern)
+    has_amount = amount_parts[1].notna()
+    amount = amount_parts[1].str.replace(',', '', regex=False)
+    sign = amount_parts[2]
+    is_debit = sign.isin(['DR', '-'])
+    # If no sign, the amount is assumed to be a credit
+    amount_dr = amount.where(has_amount & is_debit, '')
+    amount_cr = amount.where(has_amount & ~is_debit, '')
+    combined_text = amount_parts[0].str.strip().where(has_amount, combined_text)
+
+    # Extract description and remove it from the text
+    description = combined_text.str.extract(rhb_transaction_type_pattern).bfill(axis=1)[0].fillna('')
+    sender_beneficiary = [
+        text.replace(t_type, '').strip() if t_type else text
+        for text, t_type in zip(combined_text, description)
+    ]
+
+    profile_switch("dataframe")
+    # Create DataFrame
+    df = pd.DataFrame({
+        'Date': dates,
+        'Description': description,
+        'Sender/Beneficiary': sender_beneficiary,
+        'Amount (DR)': amount_dr,
+        'Amount (CR)': amount_cr
+    })
+
+    # Optionally, format the date to match desired output (e.g., '01-08-24')
+    df['Date'] = pd.to_datetime(df['Date'], format='%d-%m-%Y', errors='coerce').fillna(
+                  pd.to_datetime(df['Date'], format='%d-%m-%y', errors='coerce'))
+    df['Date'] = df['Date'].dt.strftime('%d-%m-%y')
+
+    # Split 'Sender/Beneficiary' into 'Balance', 'Sender/Beneficiary' and 'Recipient Reference':
+    # after a balance ending with '+', the next three words are the sender/beneficiary and the rest
+    # is the recipient reference
+    sender = df['Sender/Beneficiary'].astype('string').str.strip()
+    balance_parts = sender.str.extract(rhb_balance_pattern)
+    has_balance = balance_parts[0].notna()
+    words = balance_parts[1].str.split()
+
+    recipient_reference = words.str[3:].str.join(' ')
+    recipient_reference = collapse_whitespace(recipient_reference.str.replace(rhb_reference_token_pattern, '', regex=True))
+    recipient_reference = collapse_whitespace(recipient_reference.str.replace(rhb_reference_noise_pattern, '', regex=True))
+
+    df['Balance'] = balance_parts[0].where(has_balance, '')
+    df['Sender/Beneficiary'] = words.str[:3].str.join(' ').where(has_balance, sender)
+    df['Recipient Reference'] = recipient_reference.where(has_balance, '')
+
+    # Shift 'Recipient Reference' down by one row
+    df['Recipient Reference'] = df['Recipient Reference'].shift(1)
+
+    # Shift 'Amount (DR)' and 'Amount (CR)' down by one row
+    df['Amount (DR)'] = df['Amount (DR)'].shift(1)
+    df['Amount (CR)'] = df['Amount (CR)'].shift(1)
+
+    # Reset index if needed
+    df = df.reset_index(drop=True)
+
+    return df
+
+# The RHB Flex table. The second header row (the reference columns) is repeated on every page and skipped
+rhb_table = TableLayout([
+    ("date", "Date"),
+    ("branch", "Branch"),
+    ("description", "Description"),
+    ("sender", "Sender's / Beneficiary's Name"),
+    ("dr", "Amount (DR)"),
+    ("cr", "Amount (CR)"),
+    ("balance", "Balance"),
+], ["www.rhbgroup.com", "For Any Enquiries"], compile_line_filter([
+    "Reference 1 / Recipient's Reference", "Reference 2 / Other Payment Details", "RefNum",
+]))
+
+def parse_rhb_flex_table(doc, context):
+    """Same columns as parse_rhb_flex_pages(), read from the table instead of the page text.
+
+    Every cell of a transaction's row is already in its own column, so none of the text parser's
+    pattern matching or shifting of amounts and references is needed. The lines below a
+    transaction continue its description, and under the name column they hold its references.
+    """
+    date_pattern = re.compile(r'\d{2}-\d{2}-(?:\d{4}|\d{2})\b')
+    dates, descriptions, senders, references, amounts_dr, amounts_cr, balances = [], [], [], [], [], [], []
+    for cells in rhb_table.rows(doc):
+        date_match = date_pattern.match(cells.get("date", ""))
+        if date_match:
+            dates.append(date_match.group())
+            descriptions.append([cells["description"]] if "description" in cells else [])
+            senders.append(cells.get("sender", ""))
+            references.append([])
+            amounts_dr.append(cells.get("dr", ""))
+            amounts_cr.append(cells.get("cr", ""))
+            balances.append(cells.get("balance", ""))
+        elif dates:
+            if "description" in cells:
+                descriptions[-1].append(cells["description"])
+            if "sender" in cells:
+                references[-1].append(cells["sender"])
+    if not dates:
+        return None
+
+    profile_switch("dataframe")
+    df = pd.DataFrame({
+        'Date': dates,
+        'Description': [' '.join(fragments) for fragments in descriptions],
+        'Sender/Beneficiary': senders,
+        'Amount (DR)': amounts_dr,
+        'Amount (CR)': amounts_cr,
+        'Balance': balances,
+        'Recipient Reference': [' '.join(fragments) for fragments in references],
+    })
+    df['Date'] = pd.to_datetime(df['Date'], format='%d-%m-%Y', errors='coerce').fillna(
+                  pd.to_datetime(df['Date'], format='%d-%m-%y', errors='coerce'))
+    df['Date'] = df['Date'].dt.strftime('%d-%m-%y')
+    df['Amount (DR)'] = df['Amount (DR)'].str.replace(',', '', regex=False)
+    df['Amount (CR)'] = df['Amount (CR)'].str.replace(',', '', regex=False)
+    # Reference numbers are dropped as in the text parser
+    df['Recipient Reference'] = collapse_whitespace(df['Recipient Reference'].str.replace(rhb_reference_token_pattern, '', regex=True))
+    return df
+
+# Statement templates by mode key, filled in by register_template()
+PROCESSING_MODES = {}
+
+def register_template(mode, label, parse, date_column, finalize=None, date_format=None, year_column=None,
+                      amount_columns=(), read="lines", page_markers=None, strip_lines=False, header=None,
+                      sections=None, line_filter=line_filter):
+    """Add a statement template to the pipeline.
+
+    The pipeline reads the PDF and hands parse(statement, context) the template's input; context
+    holds "pdf_path" and whatever the header hook stored. What statement is depends on read:
+      "lines"     the lines of the kept pages (see page_markers), optionally stripped of blanks,
+                  passed through header(lines, context), the SectionStripper and the line filter
+      "pages"     the text of each kept page
+      "document"  the open fitz document, for templates that work on word positions
+    parse returns the file's DataFrame (or None). finalize(df) tidies the parsed rows; it must work
+    row by row, as the streaming CSV export runs it on each file's frame rather than on all files at once.
+    date_column, date_format, year_column and amount_columns describe the output for the typed exports.
+    """
+    PROCESSING_MODES[mode] = {
+        "label": label,
+        "parse": parse,
+        "finalize": finalize,
+        "date_column": date_column,
+        "date_format": date_format,
+        "year_column": year_column,
+        "amount_columns": list(amount_columns),
+        "read": read,
+        "page_markers": page_markers,
+        "strip_lines": strip_lines,
+        "header": header,
+        "sections": sections,
+        "line_filter": line_filter,
+    }
+
+register_template("maybank-debit", "Maybank Debit Card Statement Processing", parse_debit_lines, "Entry Date",
+                  page_markers=maybank_page_markers, sections=maybank_debit_sections)
+register_template("maybank-debit-layout", "Maybank Debit Card Statement Processing (layout-aware)", parse_debit_table,
+                  "Entry Date", read="document")
+register_template("maybank-credit", "Maybank Credit Card Statement Processing", parse_cc_lines, "Posting Date",
+                  finalize=finalize_cc_statement, date_format="%d/%m/%Y", year_column="Year")
+register_template("cimb-debit", "CIMB Debit Statement Processing", parse_cimb_lines, "Date",
+                  finalize=finalize_CIMB_statement, date_format="%d/%m/%Y", sections=cimb_sections)
+register_template("m2u-current", "M2U Current Account Statement", parse_m2u_current_lines, "Entry Date",
+                  page_markers=maybank_page_markers, header=find_m2u_current_year, sections=m2u_sections)
+register_template("m2u-current-layout", "M2U Current Account Statement (layout-aware)", parse_m2u_current_table,
+                  "Entry Date", read="document")
+# Keeps the non-empty lines as a list: its year search looks back over them
+register_template("m2u-debit", "M2U Current Account Debit", parse_m2u_debit_lines, "Entry Date",
+                  page_markers=maybank_page_markers, strip_lines=True, header=find_m2u_debit_year,
+                  sections=m2u_sections, line_filter=m2u_line_filter)
+register_template("m2u-debit-layout", "M2U Current Account Debit (layout-aware)", parse_m2u_debit_table, "Entry Date",
+                  read="document")
+register_template("rhb-flex", "RHB Flex Statement Processing", parse_rhb_flex_pages, "Date", date_format="%d-%m-%y",
+                  amount_columns=["Amount (DR)", "Amount (CR)", "Balance"], read="pages", page_markers=rhb_page_markers)
+register_template("rhb-flex-layout", "RHB Flex Statement Processing (layout-aware)", parse_rhb_flex_table, "Date",
+                  date_format="%d-%m-%y", amount_columns=["Amount (DR)", "Amount (CR)", "Balance"], read="document")
+
+# Checked in order against the first page: (mode, strings of which one must be on it (if any),
+# pattern that must match it (if any)). The date format tells the Maybank/M2U layouts and the card statements apart.
+template_signatures = [
+    ("m2u-debit", ["ENTRY DATE"], re.compile(r'^\d{2}/\d{2}$', re.M)),
+    ("maybank-debit", ["ENTRY DATE"], re.compile(r'^\d{2}/\d{2}/\d{2}$', re.M)),
+    ("rhb-flex", ["Date Branch Description", "www.rhbgroup.com"], None),
+    ("cimb-debit", ["CIMB", "Page / Halaman"], re.compile(r'^\d{2}/\d{2}/\d{4} ', re.M)),
+    ("maybank-credit", [], re.compile(r'^\d{2}/\d{2}\n\d{2}/\d{2}$', re.M)),
+]
+
+AUTO_MODE = "auto"
+AUTO_LABEL = "Detect Automatically (Mixed Folder)"
+
+def detect_mode(pdf_path):
+    """Return the PROCESSING_MODES key for the statement, judged from its first page, or None."""
+    pages = iter_pdf_pages(pdf_path)
+    try:
+        text = next(pages, "")
+    finally:
+        pages.close()
+    for mode, markers, pattern in template_signatures:
+        if (not markers or any(marker in text for marker in markers)) and (pattern is None or pattern.search(text)):
+            return mode
+    return None
+
+def template_file_name(excel_file_name, mode):
+    # Output name for one template of a mixed folder
+    return f"{excel_file_name}_{mode}"
+
+def mode_from_label(label):
+    # The mode key for a GUI label (AUTO_MODE for AUTO_LABEL), or None
+    if label == AUTO_LABEL:
+        return AUTO_MODE
+    for mode, spec in PROCESSING_MODES.items():
+        if spec["label"] == label:
+            return mode
+    return None
+
+def read_statement(pdf_path, spec, context):
+    # The parser input for one PDF; see register_template()
+    if spec["read"] == "pages":
+        return iter_pdf_pages(pdf_path, spec["page_markers"])
+    if spec["read"] == "document":
+        with profile_stage("open"):
+            return fitz.open(pdf_path)
+
+    lines = iter_pdf_lines(pdf_path, spec["page_markers"])
+    if spec["strip_lines"]:
+        lines = [line.strip() for line in lines if line.strip()]
+    if spec["header"] is not None:
+        lines = spec["header"](lines, context)
+    if spec["sections"] is not None:
+        lines = spec["sections"].remove(lines)
+    if spec["line_filter"] is not None:
+        lines = filter_lines(lines, spec["line_filter"])
+    return lines
+
+def parse_statement(pdf_path, mode):
+    """Read one PDF and parse it with the mode's template; returns its DataFrame (or None)."""
+    spec = PROCESSING_MODES[mode]
+    context = {"pdf_path": pdf_path}
+    statement = read_statement(pdf_path, spec, context)
+    if spec["read"] == "document":
+        with statement:
+            return spec["parse"](statement, context)
+    return spec["parse"](statement, context)
+
+def parse_pdf(pdf_path, mode):
+    # Runs in the worker processes, so errors are returned rather than printed out of order
+    try:
+        return parse_statement(pdf_path, mode), None
+    except Exception as e:
+        return None, str(e)
+
+def parse_pdf_timed(pdf_path, mode, timing):
+    # parse_pdf() plus the file's stage timings when timing is (cprofile, trace_memory); returns ((df, error), record)
+    if timing is None:
+        return parse_pdf(pdf_path, mode), None
+    with FileProfile(pdf_path, mode, *timing) as file_profile:
+        df, error = parse_pdf(pdf_path, mode)
+    return (df, error), file_profile.record(0 if df is None else len(df), error)
+
+class ProcessingCancelled(Exception):
+    pass
+
+# The pool of an enclosing worker_pool() block, shared by every parse inside it
+shared_executor = None
+
+@contextlib.contextmanager
+def worker_pool(workers, cache_dir=None, cache_size_mb=DEFAULT_CACHE_SIZE_MB):
+    """Keep one process pool running for all the parses inside the with block, so a run over many
+    folders starts its worker processes (and imports fitz and pandas in them) only once."""
+    global shared_executor
+    with ProcessPoolExecutor(max_workers=workers, initializer=configure_text_cache,
+                             initargs=(cache_dir, cache_size_mb)) as executor:
+        shared_executor = executor
+        try:
+            yield executor
+        finally:
+            shared_executor = None
+
+def iter_parse_pdf_files(pdf_paths, mode, workers=1, cache_dir=None, cache_size_mb=DEFAULT_CACHE_SIZE_MB,
+                         progress=None, cancel_event=None, profile=None):
+    """Parse the given PDFs with one mode and yield (pdf_path, df, error) for each, in the same order as pdf_paths.
+
+    Files are handed out as soon as they are parsed, so a caller that writes them out and lets go
+    of them only ever holds a few files in memory. With workers > 1 the files are parsed in a
+    process pool (the one of an enclosing worker_pool() block if there is one), at most two per
+    worker ahead of the file being yielded. With cache_dir set,
+    extracted page text is reused from (and saved to) the on-disk cache. progress(done, total, pdf_path)
+    is called as each file is yielded. If cancel_event (a threading.Event) gets set, no new files
+    are started and ProcessingCancelled is raised. With profile (a mae_profile.RunProfile) set,
+    the stage timings of every file are added to it.
+    """
+    if mode not in PROCESSING_MODES:
+        raise ValueError(f"Invalid processing mode: {mode}")
+    configure_text_cache(cache_dir, cache_size_mb)
+    total = len(pdf_paths)
+
+    def cancelled():
+        return cancel_event is not None and cancel_event.is_set()
+
+    def finish(i, result, record):
+        df, error = result
+        if error is not None:
+            print(f"Error processing {os.path.basename(pdf_paths[i])}: {error}")
+        if profile is not None:
+            profile.add(record)
+        if progress is not None:
+            progress(i + 1, total, pdf_paths[i])
+        return pdf_paths[i], df, error
+
+    timing = None if profile is None else (profile.cprofile, profile.trace_memory)
+
+    if workers > 1 and total > 1:
+        if shared_executor is not None:
+            pool = contextlib.nullcontext(shared_executor)
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=configure_text_cache,
+                                       initargs=(cache_dir, cache_size_mb))
+        with pool as executor:
+            pending = collections.deque()
+
+            def stop():
+                # A shared pool is still needed by the runs after this one, so only its queued files are dropped
+                if executor is shared_executor:
+                    for _, future in pending:
+                        future.cancel()
+                else:
+                    executor.shutdown(cancel_futures=True)
+                return ProcessingCancelled()
+
+            for i, pdf_path in enumerate(pdf_paths):
+                pending.append((i, executor.submit(parse_pdf_timed, pdf_path, mode, timing)))
+                if len(pending) < workers * 2:
+                    continue
+                j, future = pending.popleft()
+                result = finish(j, *future.result())
+                if cancelled():
+                    raise stop()
+                yield result
+            while pending:
+                j, future = pending.popleft()
+                result = finish(j, *future.result())
+                if cancelled():
+                    raise stop()
+                yield result
+    else:
+        for i, pdf_path in enumerate(pdf_paths):
+            if cancelled():
+                raise ProcessingCancelled()
+            yield finish(i, *parse_pdf_timed(pdf_path, mode, timing))
+
+    if text_cache is not None:
+        text_cache.prune()
+
+def finalized_frames(results, mode, duplicates=None, profile=None):
+    """Yield the frame of each file in results ((pdf_path, df, error) as from iter_parse_pdf_files())
+    with the mode's finalize step applied, skipping files without rows.
+
+    With duplicates (a mae_store.FingerprintIndex) set, rows it has already seen, from an earlier
+    file or an earlier run, are dropped and the number skipped is reported per file.
+    """
+    finalize = PROCESSING_MODES[mode]["finalize"]
+    for pdf_path, df, _ in results:
+        if df is None or df.empty:
+            continue
+        with run_stage(profile, "combine"):
+            if finalize is not None:
+                df = finalize(df)
+            if duplicates is not None:
+                parsed_rows = len(df)
+                df = duplicates.drop_duplicates(df, mode)
+                if len(df) < parsed_rows:
+                    print(f"{os.path.basename(pdf_path)}: skipped {parsed_rows - len(df)} duplicate row(s)")
+        if not df.empty:
+            yield df
+
+def combine_frames(results, mode, duplicates=None, profile=None):
+    frames = list(finalized_frames(results, mode, duplicates, profile))
+    if not frames:
+        return None
+    with run_stage(profile, "combine"):
+        return pd.concat(frames, ignore_index=True)
+
+def process_folder(folder_path, mode, workers=1, cache_dir=None, cache_size_mb=DEFAULT_CACHE_SIZE_MB,
+                   progress=None, cancel_event=None, profile=None, duplicates=None):
+    """Parse every PDF in folder_path with the given mode and return the combined DataFrame (None if nothing was parsed).
+
+    The per-file frames are always combined in file order, so the output does not depend on workers.
+    See iter_parse_pdf_files() for progress, cancel_event and profile, and finalized_frames() for duplicates.
+    """
+    results = list(iter_parse_pdf_files(list_pdf_files(folder_path), mode, workers, cache_dir, cache_size_mb,
+                                        progress, cancel_event, profile))
+    return combine_frames(results, mode, duplicates, profile)
+
+def group_by_template(pdf_paths, unreadable=None):
+    # {mode: [pdf_path, ...]} by detect_mode(); PDFs that cannot be read or match no template are reported and left out.
+    # The ones that could not be read are also added to unreadable (a list), if given
+    groups = {}
+    for pdf_path in pdf_paths:
+        try:
+            mode = detect_mode(pdf_path)
+        except Exception as e:
+            # A damaged or encrypted PDF must not stop the rest of the folder
+            print(f"Error reading {os.path.basename(pdf_path)}: {e}")
+            if unreadable is not None:
+                unreadable.append(pdf_path)
+            continue
+        if mode is None:
+            print(f"Could not tell which statement type {os.path.basename(pdf_path)} is, skipped")
+            continue
+        groups.setdefault(mode, []).append(pdf_path)
+    return groups
+
+def iter_template_results(folder_path, workers=1, cache_dir=None, cache_size_mb=DEFAULT_CACHE_SIZE_MB,
+                          progress=None, cancel_event=None, profile=None):
+    # Yields (mode, iter_parse_pdf_files() of its PDFs) per template found in the folder; progress counts across all of them
+    configure_text_cache(cache_dir, cache_size_mb)
+    groups = group_by_template(list_pdf_files(folder_path))
+    total = sum(len(pdf_paths) for pdf_paths in groups.values())
+    done_before = 0
+    for mode in PROCESSING_MODES:
+        if mode not in groups:
+            continue
+        pdf_paths = groups[mode]
+        print(f"{len(pdf_paths)} {PROCESSING_MODES[mode]['label']} file(s)")
+
+        def group_progress(done, _, pdf_path):
+            progress(done_before + done, total, pdf_path)
+
+        yield mode, iter_parse_pdf_files(pdf_paths, mode, workers, cache_dir, cache_size_mb,
+                                         group_progress if progress is not None else None, cancel_event, profile)
+        done_before += len(pdf_paths)
+
+def process_folder_by_template(folder_path, workers=1, cache_dir=None, cache_size_mb=DEFAULT_CACHE_SIZE_MB,
+                               progress=None, cancel_event=None, profile=None, duplicates=None):
+    """Parse a folder holding statements of several banks/templates in one pass.
+
+    Each PDF is routed to its parser by detect_mode(); PDFs that match no template are reported
+    and skipped. Returns {mode: combined DataFrame} for the templates that produced rows.
+    """
+    frames = {}
+    for mode, results in iter_template_results(folder_path, workers, cache_dir, cache_size_mb,
+                                               progress, cancel_event, profile):
+        combined_df = combine_frames(list(results), mode, duplicates, profile)
+        if combined_df is not None:
+            frames[mode] = combined_df
+    return frames
+
+def export_csv(df, export_path, excel_file_name):
+    os.makedirs(export_path, exist_ok=True)
+    excel_path = os.path.join(export_path, f"{excel_file_name}.csv")
+    df.to_csv(excel_path, index=False)
+    print(f"Data exported to {excel_path}")
+    return excel_path
+
+def stream_csv(frames, excel_path, append=False, profile=None):
+    """Write per-file frames (see finalized_frames()) to a CSV as they come in; returns the number of rows written.
+
+    Only the frame being written is held in memory, so memory stays flat however many statements
+    there are. The header is taken from the first frame (or the existing file when appending) and
+    later frames are written in its column order. Without append the CSV is written to a temporary file first and only replaces excel_path once
+    every frame is in, so a failed or cancelled run leaves the previous export as it was.
+    """
+    header = None
+    if append and os.path.exists(excel_path):
+        with open(excel_path, newline='', encoding='utf-8') as f:
+            header = next(csv.reader(f), None)
+    # The temporary file is opened like any other, so it gets the usual permissions (mkstemp would make it private)
+    target = excel_path if append else excel_path + '.tmp'
+
+    rows = 0
+    f = None
+    try:
+        for df in frames:
+            with run_stage(profile, "export"):
+                if f is None:
+                    f = open(target, 'a' if header else 'w', newline='', encoding='utf-8')
+                    write_header = not header
+                    if write_header:
+                        header = list(df.columns)
+                else:
+                    write_header = False
+                df.reindex(columns=header).to_csv(f, header=write_header, index=False)
+            rows += len(df)
+    except BaseException:
+        if f is not None:
+            f.close()
+            if not append:
+                os.remove(target)
+        raise
+
+    if f is not None:
+        f.close()
+        if not append:
+            if rows:
+                if os.path.exists(excel_path):
+                    shutil.copymode(excel_path, target)  # Keep the permissions of the export it replaces
+                os.replace(target, excel_path)
+            else:
+                os.remove(target)
+    return rows
+
+def export_folder_csv(folder_path, mode, export_path, excel_file_name, workers=1, cache_dir=None,
+                      cache_size_mb=DEFAULT_CACHE_SIZE_MB, progress=None, cancel_event=None, profile=None,
+                      duplicates=None):
+    """process_folder() followed by export_csv(), writing each PDF's rows as soon as it is parsed.
+
+    Gives the same CSV without ever holding the whole folder in memory. duplicates is as for
+    process_folder(). Returns (CSV path, rows written); the path is None (and any existing CSV is
+    left alone) if no rows were parsed.
+    """
+    os.makedirs(export_path, exist_ok=True)
+    excel_path = os.path.join(export_path, f"{excel_file_name}.csv")
+    results = iter_parse_pdf_files(list_pdf_files(folder_path), mode, workers, cache_dir, cache_size_mb,
+                                   progress, cancel_event, profile)
+    rows = stream_csv(finalized_frames(results, mode, duplicates, profile), excel_path, profile=profile)
+    if not rows:
+        return None, 0
+    print(f"Data exported to {excel_path}")
+    return excel_path, rows
+
+def export_folder_by_template_csv(folder_path, export_path, excel_file_name=None, workers=1, cache_dir=None,
+                                  cache_size_mb=DEFAULT_CACHE_SIZE_MB, progress=None, cancel_event=None, profile=None,
+                                  duplicates=None):
+    """process_folder_by_template() with each template streamed to its own CSV like export_folder_csv().
+
+    The CSVs are named template_file_name(excel_file_name, mode), or just the mode without
+    excel_file_name. Returns {mode: (CSV path, rows written)} for the templates that produced rows.
+    """
+    os.makedirs(export_path, exist_ok=True)
+    exported = {}
+    for mode, results in iter_template_results(folder_path, workers, cache_dir, cache_size_mb,
+                                               progress, cancel_event, profile):
+        file_name = template_file_name(excel_file_name, mode) if excel_file_name else mode
+        excel_path = os.path.join(export_path, f"{file_name}.csv")
+        rows = stream_csv(finalized_frames(results, mode, duplicates, profile), excel_path, profile=profile)
+        if rows:
+            print(f"Data exported to {excel_path}")
+            exported[mode] = (excel_path, rows)
+    return exported
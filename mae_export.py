@@ -0,0 +1,68 @@
+import os
+
+import pandas as pd
+
+from mae_engine import PROCESSING_MODES, export_csv
+
+
+OUTPUT_FORMATS = ("csv", "parquet", "feather")
+
+def typed_frame(df, mode):
+    """Return a copy of a mode's combined frame with a real datetime date column, numeric amounts,
+    and year/month columns taken from that date (0 for rows without a date)."""
+    spec = PROCESSING_MODES[mode]
+    df = df.copy()
+
+    date_column = spec["date_column"]
+    dates = df[date_column]
+    if spec["year_column"] is not None:
+        dates = dates.astype('string') + '/' + df[spec["year_column"]].astype('string')
+    dates = pd.to_datetime(dates, format=spec["date_format"], errors='coerce')
+    df[date_column] = dates
+
+    for column in spec["amount_columns"]:
+        # RHB Flex balances end with '+'
+        values = df[column].astype('string').str.replace(',', '', regex=False).str.rstrip('+')
+        df[column] = pd.to_numeric(values, errors='coerce')
+
+    # Plain int64 partition keys: pandas.read_parquet() cannot read nullable Int32 ones back
+    df['year'] = dates.dt.year.fillna(0).astype('int64')
+    df['month'] = dates.dt.month.fillna(0).astype('int64')
+    return df
+
+def export_partitioned(df, mode, export_path, excel_file_name, output_format, account):
+    """Write the frame as a Parquet or Arrow IPC (Feather) dataset under export_path/excel_file_name,
+    partitioned account=<account>/year=<yyyy>/month=<m> so one month can be read on its own.
+
+    Rows without a date go to the year=0/month=0 folder. Partitions present in
+    df are replaced; other partitions already in the dataset are left alone.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+    except ImportError:
+        raise RuntimeError(f"Exporting to {output_format} needs pyarrow (pip install pyarrow)")
+
+    df = typed_frame(df, mode)
+    df['account'] = account
+
+    base_dir = os.path.join(export_path, excel_file_name)
+    extension = "parquet" if output_format == "parquet" else "arrow"
+    ds.write_dataset(
+        pa.Table.from_pandas(df, preserve_index=False),
+        base_dir,
+        format="parquet" if output_format == "parquet" else "ipc",
+        partitioning=["account", "year", "month"],
+        partitioning_flavor="hive",
+        basename_template=f"{excel_file_name}-{{i}}.{extension}",
+        existing_data_behavior="delete_matching",
+    )
+    print(f"Data exported to {base_dir}")
+    return base_dir
+
+def export_table(df, mode, export_path, excel_file_name, output_format="csv", account=None):
+    if output_format == "csv":
+        return export_csv(df, export_path, excel_file_name)
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format}")
+    return export_partitioned(df, mode, export_path, excel_file_name, output_format, account or excel_file_name)
@@ -0,0 +1,96 @@
+import json
+import os
+from datetime import datetime
+
+from mae_cache import DEFAULT_CACHE_SIZE_MB, hash_file
+from mae_engine import list_pdf_files, iter_parse_pdf_files, finalized_frames, stream_csv
+from mae_store import FingerprintIndex
+
+
+def manifest_path(export_path, excel_file_name):
+    return os.path.join(export_path, f"{excel_file_name}.manifest.json")
+
+def load_manifest(path, mode):
+    # Returns ({file hash: details}, [row fingerprint, ...]) for the statements already in the output
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}, []
+    if manifest.get("mode") != mode:
+        print(f"Manifest {path} was written for another mode, starting over")
+        return {}, []
+    return manifest.get("files", {}), manifest.get("fingerprints", [])
+
+def save_manifest(path, mode, files, fingerprints=()):
+    # Opened normally (not with mkstemp) so the manifest gets the same permissions as the CSV
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"mode": mode, "files": files, "fingerprints": sorted(fingerprints)}, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def process_folder_incremental(folder_path, mode, export_path, excel_file_name, workers=1,
+                               cache_dir=None, cache_size_mb=DEFAULT_CACHE_SIZE_MB, profile=None,
+                               keep_duplicates=False):
+    """Parse only the PDFs in folder_path that are not yet in the output and append their rows to it.
+
+    Which statements have been ingested is tracked by content hash in a manifest saved next to
+    the CSV, so renamed or moved files are not parsed twice. If the CSV is missing the manifest is
+    ignored and everything is parsed again. The fingerprints of the rows in the CSV are kept in the
+    manifest too, so rows of a new statement that overlaps one already ingested (a re-download
+    covering the same dates) are skipped unless keep_duplicates is set. Returns the number of
+    rows appended.
+    """
+    return ingest_files(list_pdf_files(folder_path), mode, export_path, excel_file_name, workers,
+                        cache_dir, cache_size_mb, profile, keep_duplicates)
+
+def ingest_files(pdf_paths, mode, export_path, excel_file_name, workers=1,
+                 cache_dir=None, cache_size_mb=DEFAULT_CACHE_SIZE_MB, profile=None, keep_duplicates=False,
+                 failed=None):
+    # process_folder_incremental() for a given list of PDFs; the PDFs that could not be parsed are added to failed (a list)
+    os.makedirs(export_path, exist_ok=True)
+    excel_path = os.path.join(export_path, f"{excel_file_name}.csv")
+    path = manifest_path(export_path, excel_file_name)
+    files, seen_rows = load_manifest(path, mode) if os.path.exists(excel_path) else ({}, [])
+    duplicates = None if keep_duplicates else FingerprintIndex(excel_file_name, seen_rows)
+    # With nothing recorded, any existing CSV is replaced rather than appended to
+    starting_over = not files
+
+    new_files = []
+    seen = set(files)
+    for pdf_path in pdf_paths:
+        digest = hash_file(pdf_path)
+        if digest in seen:
+            continue
+        seen.add(digest)
+        new_files.append((pdf_path, digest))
+
+    print(f"{len(new_files)} new statement(s), {len(files)} already processed")
+    if not new_files:
+        return 0
+
+    digests = dict(new_files)
+
+    def parsed_files():
+        for pdf_path, df, error in iter_parse_pdf_files(list(digests), mode, workers, cache_dir, cache_size_mb,
+                                                        profile=profile):
+            if error is not None:
+                # Not recorded, so it is retried on the next run
+                if failed is not None:
+                    failed.append(pdf_path)
+                continue
+            files[digests[pdf_path]] = {
+                "file": os.path.basename(pdf_path),
+                "rows": 0 if df is None else len(df),
+                "processed": datetime.now().isoformat(timespec='seconds'),
+            }
+            yield pdf_path, df, error
+
+    # Rows are written file by file; when starting over they replace any existing CSV
+    rows = stream_csv(finalized_frames(parsed_files(), mode, duplicates, profile), excel_path,
+                      append=not starting_over, profile=profile)
+    if rows:
+        print(f"Appended {rows} rows to {excel_path}")
+
+    save_manifest(path, mode, files, seen_rows if duplicates is None else duplicates.seen)
+    return rows
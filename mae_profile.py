@@ -0,0 +1,231 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+
+# Stages in the order a file goes through them; anything else is listed after these
+STAGE_ORDER = ["open", "cache", "extract", "split", "filter", "parse", "dataframe", "combine", "export"]
+
+# The FileProfile recording in this process, if any. Everything below is a no-op while it is None,
+# so the parsers can be instrumented without slowing down normal runs.
+active = None
+
+class FileProfile:
+    """Wall time per stage and counters for one file.
+
+    Time is charged to the innermost running stage only, so the stages add up to the file's
+    total even though extraction, filtering and parsing run interleaved as generators.
+    """
+
+    def __init__(self, pdf_path, mode, cprofile=False, trace_memory=False):
+        self.file = os.path.basename(pdf_path)
+        self.mode = mode
+        self.cprofile = cprofile
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self.counts = {}
+        self.stack = []
+        self.mark = None
+        self.seconds = 0.0
+        self.profiler = None
+        self.top_functions = None
+        self.peak_memory_mb = None
+
+    def charge(self):
+        now = time.perf_counter()
+        if self.stack:
+            name = self.stack[-1]
+            self.stages[name] = self.stages.get(name, 0.0) + now - self.mark
+        self.mark = now
+
+    def enter(self, name):
+        self.charge()
+        self.stack.append(name)
+
+    def exit(self):
+        self.charge()
+        self.stack.pop()
+
+    def switch(self, name):
+        # The rest of the current stage is counted as `name`
+        self.charge()
+        self.stack[-1] = name
+
+    def count(self, name, n=1):
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def __enter__(self):
+        global active
+        active = self
+        if self.trace_memory:
+            tracemalloc.start()
+        if self.cprofile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.start = time.perf_counter()
+        self.enter("parse")
+        return self
+
+    def __exit__(self, *exc_info):
+        global active
+        self.exit()
+        self.seconds = time.perf_counter() - self.start
+        if self.profiler is not None:
+            self.profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(self.profiler, stream=out).sort_stats("cumulative").print_stats(15)
+            self.top_functions = out.getvalue()
+            self.profiler = None
+        if self.trace_memory:
+            self.peak_memory_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+        active = None
+        return False
+
+    def record(self, rows=0, error=None):
+        # A plain dict, so it can be sent back from a worker process and written as JSON
+        record = {
+            "file": self.file,
+            "mode": self.mode,
+            "seconds": round(self.seconds, 6),
+            "rows": rows,
+            "error": error,
+            "stages": {name: round(seconds, 6) for name, seconds in self.stages.items()},
+            "counts": self.counts,
+        }
+        if self.peak_memory_mb is not None:
+            record["peak_memory_mb"] = round(self.peak_memory_mb, 3)
+        if self.top_functions is not None:
+            record["cprofile"] = self.top_functions
+        return record
+
+def profile_stage(name):
+    # Times a block of code as `name`
+    if active is None:
+        return nullcontext()
+    return _stage(active, name)
+
+@contextmanager
+def _stage(profile, name):
+    profile.enter(name)
+    try:
+        yield
+    finally:
+        profile.exit()
+
+def profile_switch(name):
+    if active is not None:
+        active.switch(name)
+
+def profile_count(name, n=1):
+    if active is not None:
+        active.count(name, n)
+
+def timed(items, name, count=None):
+    """Charge the time spent producing each item of a generator to `name` (and count the items)."""
+    if active is None:
+        return items
+    return _timed(iter(items), name, count, active)
+
+def _timed(items, name, count, profile):
+    while True:
+        profile.enter(name)
+        try:
+            item = next(items)
+        except StopIteration:
+            return
+        finally:
+            profile.exit()
+        if count is not None:
+            profile.count(count)
+        yield item
+
+def run_stage(profile, name):
+    # profile.stage(name), or nothing when the run is not being profiled
+    return nullcontext() if profile is None else profile.stage(name)
+
+def ordered_stages(names):
+    return sorted(names, key=lambda name: (STAGE_ORDER.index(name) if name in STAGE_ORDER else len(STAGE_ORDER), name))
+
+class RunProfile:
+    """Collects the per-file records of a run, plus the run-level stages (combining and export)."""
+
+    def __init__(self, cprofile=False, trace_memory=False):
+        self.cprofile = cprofile
+        self.trace_memory = trace_memory
+        self.files = []
+        self.stages = {}
+
+    def add(self, record):
+        self.files.append(record)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def totals(self):
+        # Sums over all files, with the run-level stages added
+        stages = {}
+        counts = {}
+        for record in self.files:
+            for name, seconds in record["stages"].items():
+                stages[name] = stages.get(name, 0.0) + seconds
+            for name, n in record["counts"].items():
+                counts[name] = counts.get(name, 0) + n
+        for name, seconds in self.stages.items():
+            stages[name] = stages.get(name, 0.0) + seconds
+        return stages, counts
+
+    def write_jsonl(self, path):
+        """One JSON object per file, then a {"run": ...} line with the totals."""
+        stages, counts = self.totals()
+        f = sys.stdout if path == "-" else open(path, "w", encoding="utf-8")
+        try:
+            for record in self.files:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.write(json.dumps({"run": {
+                "files": len(self.files),
+                "rows": sum(record["rows"] for record in self.files),
+                "stages": {name: round(seconds, 6) for name, seconds in stages.items()},
+                "counts": counts,
+            }}) + "\n")
+        finally:
+            if f is not sys.stdout:
+                f.close()
+
+    def print_summary(self, slowest=10):
+        stages, counts = self.totals()
+        total = sum(stages.values())
+        print(f"\n{len(self.files)} file(s), {sum(record['rows'] for record in self.files)} rows, "
+              + ", ".join(f"{n} {name}" for name, n in counts.items()))
+        print(f"{'stage':<10} {'seconds':>9} {'share':>7}")
+        for name in ordered_stages(stages):
+            share = stages[name] / total * 100 if total else 0.0
+            print(f"{name:<10} {stages[name]:>9.3f} {share:>6.1f}%")
+
+        if not self.files:
+            return
+        columns = ordered_stages({name for record in self.files for name in record["stages"]})
+        memory = any("peak_memory_mb" in record for record in self.files)
+        print(f"\nSlowest {min(slowest, len(self.files))} file(s):")
+        print(f"{'file':<40} {'seconds':>8} {'rows':>6} {'lines':>7} "
+              + " ".join(f"{name:>9}" for name in columns) + (f" {'peak MB':>8}" if memory else ""))
+        by_time = sorted(self.files, key=lambda record: record["seconds"], reverse=True)
+        for record in by_time[:slowest]:
+            print(f"{record['file'][:40]:<40} {record['seconds']:>8.3f} {record['rows']:>6} "
+                  f"{record['counts'].get('lines', 0):>7} "
+                  + " ".join(f"{record['stages'].get(name, 0.0):>9.3f}" for name in columns)
+                  + (f" {record.get('peak_memory_mb', 0.0):>8.2f}" if memory else ""))
+        if "cprofile" in by_time[0]:
+            print(f"\ncProfile of {by_time[0]['file']}:")
+            print(by_time[0]["cprofile"])
@@ -0,0 +1,138 @@
+import hashlib
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+from mae_engine import PROCESSING_MODES
+from mae_export import typed_frame
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    fingerprint TEXT PRIMARY KEY,
+    account TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    date TEXT,
+    description TEXT,
+    amount REAL,
+    balance REAL,
+    ingested_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_account_date ON transactions (account, date);
+CREATE INDEX IF NOT EXISTS idx_transactions_amount ON transactions (amount);
+"""
+
+def open_store(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+def signed_by_flow(amount, flow, inflow):
+    # Amounts are stored positive with a separate flow column in the Maybank/M2U modes
+    return amount.where(flow == inflow, -amount)
+
+# Per mode: typed combined frame -> (description, signed amount with money in positive, balance)
+def normalize_maybank_debit(df):
+    return df['Transaction Description'], signed_by_flow(df['Transaction Amount'], df['flow'], 'Deposit'), df['Statement_Balance']
+
+def normalize_maybank_credit(df):
+    # Card charges are positive and payments (CR) negative on the statement
+    return df['Transaction Description'], -df['Amount'], None
+
+def normalize_cimb_debit(df):
+    return df['Transaction Description'], df['Amount'], df['Balance After Transaction']
+
+def normalize_m2u_debit(df):
+    return df['Transaction Description'], signed_by_flow(df['Transaction Amount'], df['flow'], 'inflow'), df['Statement Balance']
+
+def normalize_rhb_flex(df):
+    description = (df['Description'].fillna('') + ' ' + df['Sender/Beneficiary'].fillna('')).str.strip()
+    return description, df['Amount (CR)'].fillna(0) - df['Amount (DR)'].fillna(0), df['Balance']
+
+NORMALIZERS = {
+    "maybank-debit": normalize_maybank_debit,
+    "maybank-debit-layout": normalize_maybank_debit,
+    "maybank-credit": normalize_maybank_credit,
+    "cimb-debit": normalize_cimb_debit,
+    "m2u-current": normalize_maybank_debit,
+    "m2u-current-layout": normalize_maybank_debit,
+    "m2u-debit": normalize_m2u_debit,
+    "m2u-debit-layout": normalize_m2u_debit,
+    "rhb-flex": normalize_rhb_flex,
+    "rhb-flex-layout": normalize_rhb_flex,
+}
+
+def normalize_transactions(df, mode, account):
+    """Map a mode's combined frame onto the store's columns, with a fingerprint per row.
+
+    The fingerprint hashes account, date, amount, description and balance, plus a counter for
+    identical rows, so two genuine identical purchases on one day are both kept while ingesting
+    the same statement again produces the same fingerprints.
+    """
+    typed = typed_frame(df, mode)
+    description, amount, balance = NORMALIZERS[mode](typed)
+
+    normalized = pd.DataFrame({
+        'account': account,
+        'mode': mode,
+        'date': typed[PROCESSING_MODES[mode]["date_column"]].dt.strftime('%Y-%m-%d'),
+        'description': description.astype('string').str.strip(),
+        'amount': amount.round(2),
+        'balance': balance.round(2) if balance is not None else None,
+    })
+
+    normalized['fingerprint'] = row_fingerprints(normalized)
+    return normalized
+
+def row_fingerprints(normalized):
+    # sha1 of account|date|amount|description|balance|n, where n counts the same values earlier in the frame
+    key = (normalized['account'] + '|' + normalized['date'].fillna('')
+           + '|' + normalized['amount'].astype('string').fillna('')
+           + '|' + normalized['description'].fillna('')
+           + '|' + normalized['balance'].astype('string').fillna(''))
+    occurrence = key.groupby(key).cumcount().astype('string')
+    return [hashlib.sha1(k.encode('utf-8')).hexdigest() for k in key + '|' + occurrence]
+
+class FingerprintIndex:
+    """The fingerprints (see normalize_transactions()) of every transaction ingested so far, for
+    dropping the rows of overlapping or repeated statements before they reach the output.
+
+    Fingerprints are kept in a set, so checking a row costs the same however many are indexed.
+    The occurrence counter is per statement: identical rows within one statement are all kept,
+    while the same row turning up in another statement is a duplicate.
+    """
+
+    def __init__(self, account="", seen=()):
+        self.account = account
+        self.seen = set(seen)
+        self.skipped = 0
+
+    def drop_duplicates(self, df, mode):
+        # df is one statement's finalized frame; returns it without the rows seen before
+        keys = normalize_transactions(df, mode, self.account)['fingerprint']
+        new = [key not in self.seen for key in keys]
+        self.seen.update(keys)
+        self.skipped += new.count(False)
+        return df[new]
+
+def upsert_transactions(conn, df, mode, account):
+    """Insert or update the rows of a mode's combined frame; returns the number of rows written."""
+    normalized = normalize_transactions(df, mode, account)
+    ingested_at = datetime.now().isoformat(timespec='seconds')
+    columns = ['fingerprint', 'account', 'mode', 'date', 'description', 'amount', 'balance']
+    rows = [tuple(None if pd.isna(v) else v for v in row) + (ingested_at,)
+            for row in normalized[columns].itertuples(index=False, name=None)]
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO transactions (fingerprint, account, mode, date, description, amount, balance, ingested_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (fingerprint) DO UPDATE SET
+                description = excluded.description,
+                balance = excluded.balance,
+                ingested_at = excluded.ingested_at
+            """,
+            rows,
+        )
+    return len(rows)
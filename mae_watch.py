@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+
+from mae_cache import DEFAULT_CACHE_SIZE_MB
+from mae_engine import AUTO_MODE, group_by_template, template_file_name
+from mae_incremental import ingest_files
+
+# Seconds before a PDF that could not be ingested is tried again (sooner if the file changes)
+RETRY_SECONDS = 30
+
+def pdf_signatures(folder_path):
+    # {path: (size, mtime)} of the PDFs in the folder; a changed signature means the file changed
+    signatures = {}
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            if entry.name.endswith('.pdf') and entry.is_file():
+                stat = entry.stat()
+                signatures[entry.path] = (stat.st_size, stat.st_mtime)
+    return signatures
+
+def looks_complete(pdf_path):
+    # A PDF that is still being written does not end with its %%EOF trailer yet
+    try:
+        with open(pdf_path, 'rb') as f:
+            f.seek(max(os.path.getsize(pdf_path) - 1024, 0))
+            return b'%%EOF' in f.read()
+    except OSError:
+        return False
+
+def start_event_watch(folder_path, wakeup):
+    """Set wakeup whenever something changes in the folder, using the OS file events (inotify on
+    Linux) through the watchdog package. Returns the running observer, or None without watchdog."""
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        return None
+
+    class WakeupHandler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            wakeup.set()
+
+    observer = Observer()
+    observer.schedule(WakeupHandler(), folder_path, recursive=False)
+    observer.daemon = True
+    observer.start()
+    return observer
+
+def ingest_ready_files(pdf_paths, mode, export_path, excel_file_name, workers, cache_dir, cache_size_mb, keep_duplicates,
+                       failed):
+    # Returns the rows added; the PDFs that could not be read or parsed are added to failed
+    if mode != AUTO_MODE:
+        return ingest_files(pdf_paths, mode, export_path, excel_file_name, workers, cache_dir, cache_size_mb,
+                            keep_duplicates=keep_duplicates, failed=failed)
+
+    # One output per template, named like the mixed-folder run names them
+    return sum(ingest_files(group, detected_mode, export_path,
+                            template_file_name(excel_file_name, detected_mode) if excel_file_name else detected_mode,
+                            workers, cache_dir, cache_size_mb, keep_duplicates=keep_duplicates, failed=failed)
+               for detected_mode, group in group_by_template(pdf_paths, unreadable=failed).items())
+
+def watch_folder(folder_path, mode, export_path, excel_file_name, poll_interval=2.0, settle_seconds=2.0,
+                 workers=1, cache_dir=None, cache_size_mb=DEFAULT_CACHE_SIZE_MB, use_events=True, stop_event=None,
+                 keep_duplicates=False):
+    """Keep appending the rows of new PDFs in folder_path to the output until stopped.
+
+    PDFs already in the folder are ingested first. After that the folder is re-scanned whenever
+    the OS reports a change (or every poll_interval seconds without watchdog). A new or changed
+    PDF is parsed once it has not been modified for settle_seconds and ends with its %%EOF
+    trailer, so files that are still being downloaded or copied are left alone until complete.
+    A PDF that cannot be read, or a round that fails (for example because the CSV is locked), is
+    reported and tried again after RETRY_SECONDS, and watching carries on.
+    Rows are appended as in process_folder_incremental(), so a statement is never added twice
+    and rows already in the output are skipped unless keep_duplicates is set.
+    mode may be AUTO_MODE to detect each file's template, with one output per template named
+    <excel_file_name>_<mode> (or just <mode> when excel_file_name is None). Runs until Ctrl+C or
+    stop_event is set.
+    """
+    wakeup = threading.Event()
+    observer = start_event_watch(folder_path, wakeup) if use_events else None
+    if observer is not None:
+        print(f"Watching {folder_path} for new statements (Ctrl+C to stop)")
+    else:
+        print(f"Checking {folder_path} for new statements every {poll_interval:g}s (Ctrl+C to stop)")
+
+    seen = {}  # path -> signature it had when it was ingested
+    retry = {}  # path -> (signature it had when it failed, time to try it again)
+    try:
+        while stop_event is None or not stop_event.is_set():
+            now = time.time()
+            signatures = pdf_signatures(folder_path)
+            retry = {pdf_path: entry for pdf_path, entry in retry.items() if pdf_path in signatures}
+            ready = []
+            settling = False
+            for pdf_path, signature in signatures.items():
+                if seen.get(pdf_path) == signature:
+                    continue
+                if pdf_path in retry and retry[pdf_path][0] == signature and now < retry[pdf_path][1]:
+                    continue
+                if now - signature[1] >= settle_seconds and looks_complete(pdf_path):
+                    ready.append(pdf_path)
+                else:
+                    settling = True
+
+            if ready:
+                start = time.perf_counter()
+                failed = []
+                try:
+                    rows = ingest_ready_files(ready, mode, export_path, excel_file_name, workers, cache_dir,
+                                              cache_size_mb, keep_duplicates, failed)
+                    print(f"{len(ready)} file(s) checked, {rows} rows added in {time.perf_counter() - start:.1f}s")
+                except Exception as e:
+                    # Files already in the manifest are skipped on the retry, so nothing is added twice
+                    print(f"Error adding new statements: {e}")
+                    failed = ready
+                for pdf_path in ready:
+                    if pdf_path in failed:
+                        retry[pdf_path] = (signatures[pdf_path], now + RETRY_SECONDS)
+                    else:
+                        seen[pdf_path] = signatures[pdf_path]
+                        retry.pop(pdf_path, None)
+                if failed:
+                    print(f"{len(failed)} file(s) will be tried again in {RETRY_SECONDS}s")
+
+            # With file events the periodic scan is only a safety net; files still being written are checked again soon
+            timeout = poll_interval if observer is None else poll_interval * 15
+            if settling:
+                timeout = min(timeout, settle_seconds / 2)
+            if retry:
+                timeout = min(timeout, max(min(retry_at for _, retry_at in retry.values()) - time.time(), 0.1))
+            wakeup.wait(timeout)
+            wakeup.clear()
+    except KeyboardInterrupt:
+        print("Stopped watching")
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()
@@ -0,0 +1,23 @@
+from mae_batch import run_jobs
+from mae_cli import main
+
+
+def test_incremental_with_sqlite_is_rejected(tmp_path, capsys):
+    db_path = tmp_path / "transactions.db"
+    assert main(["cimb-debit", str(tmp_path), "--incremental", "--sqlite", str(db_path)]) == 2
+    assert "--sqlite cannot be combined with --incremental" in capsys.readouterr().err
+    assert not db_path.exists()
+
+def test_batch_job_with_incremental_and_sqlite_fails(tmp_path):
+    db_path = tmp_path / "transactions.db"
+    report = run_jobs([{"mode": "cimb-debit", "source": str(tmp_path), "incremental": True, "sqlite": str(db_path)}])
+    assert report["failed"] == 1
+    assert "--incremental" in report["jobs"][0]["error"]
+    assert not db_path.exists()
+
+def test_watch_rejects_options_it_would_ignore(tmp_path, capsys):
+    for option in (["--sqlite", str(tmp_path / "transactions.db")], ["--account", "savings"],
+                   ["--timings", "-"], ["--timings-table"], ["--cprofile"], ["--tracemalloc"]):
+        assert main(["cimb-debit", str(tmp_path), "--watch"] + option) == 2
+        assert f"{option[0]} cannot be combined with --watch" in capsys.readouterr().err
+    assert not (tmp_path / "transactions.db").exists()